@@ -0,0 +1,298 @@
+import argparse
+import json
+from datetime import date, datetime
+
+import numpy as np
+
+from data_fetcher import NBADataFetcher
+from parser import NBADataParser
+from predictor import ThreePointPredictor, load_confidence_params
+from simple_position_defense import SimplePositionDefense
+
+TIERS = ['HIGH', 'MEDIUM', 'LOW']
+
+# Prediction buckets for the calibration table: [0, 1), [1, 2), ... [5, inf)
+PREDICTION_BINS = [0, 1, 2, 3, 4, 5]
+
+
+def load_player_games(response_dict):
+    """
+    Flatten a PlayerGameLogs response into column arrays, one entry per
+    player-game, sorted by player and then date (oldest first)
+    Returns: dict of arrays player_id, team_id, game_id, game, date_ordinal, fg3m, fg3a
+             ('game' is a dense code per GAME_ID)
+    """
+    result_set = response_dict['resultSets'][0]
+    headers = result_set['headers']
+    idx = {name: headers.index(name) for name in ('PLAYER_ID', 'TEAM_ID', 'GAME_ID', 'GAME_DATE', 'FG3M', 'FG3A')}
+
+    rows = [row for row in result_set['rowSet'] if row[idx['FG3A']] is not None]
+    player_id = np.array([row[idx['PLAYER_ID']] for row in rows], dtype=np.int64)
+    team_id = np.array([row[idx['TEAM_ID']] for row in rows], dtype=np.int64)
+    game_id = np.array([str(row[idx['GAME_ID']]) for row in rows])
+    _, game = np.unique(game_id, return_inverse=True)
+    # League logs use ISO timestamps ('2025-10-22T00:00:00')
+    date_ordinal = np.array([date.fromisoformat(row[idx['GAME_DATE']][:10]).toordinal() for row in rows],
+                            dtype=np.int32)
+    fg3m = np.array([row[idx['FG3M']] or 0 for row in rows], dtype=float)
+    fg3a = np.array([row[idx['FG3A']] or 0 for row in rows], dtype=float)
+
+    order = np.lexsort((date_ordinal, player_id))
+    return {
+        'player_id': player_id[order],
+        'team_id': team_id[order],
+        'game_id': game_id[order],
+        'game': game.reshape(-1)[order],
+        'date_ordinal': date_ordinal[order],
+        'fg3m': fg3m[order],
+        'fg3a': fg3a[order],
+    }
+
+
+def _group_rank(keys):
+    """0-based position of each entry within its run of equal (sorted) keys"""
+    n = len(keys)
+    starts = np.r_[True, keys[1:] != keys[:-1]] if n else np.zeros(0, dtype=bool)
+    start_index = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    return np.arange(n) - start_index
+
+
+def _exclusive_cumsum(values, rank):
+    """Sum of earlier values within each group (rank from _group_rank)"""
+    cumulative = np.cumsum(values)
+    before_group = (cumulative - values)[np.arange(len(values)) - rank]
+    return cumulative - values - before_group
+
+
+def opponent_defense_to_date(games, pos_def=None, predictor=None, min_team_games=3):
+    """
+    For each player-game, the opponent's [guard, forward, center] 3P% allowed
+    using only games that team played before that date. Team totals are summed
+    from the player rows, so no extra requests are needed. Teams with fewer than
+    min_team_games prior games fall back to the league average
+    Returns: (defense (N, 3) array, opponent_team_id (N,) array, -1 where the
+             opponent is not in the logs)
+    """
+    pos_def = pos_def or SimplePositionDefense()
+    predictor = predictor or ThreePointPredictor()
+    n = len(games['game'])
+
+    # One entry per (game, team): what that team shot, and so what its opponent allowed
+    team_codes, team = np.unique(games['team_id'], return_inverse=True)
+    team = team.reshape(-1)
+    team_game_keys, team_game = np.unique(games['game'] * len(team_codes) + team, return_inverse=True)
+    team_game = team_game.reshape(-1)
+    tg_game = team_game_keys // len(team_codes)
+    tg_team = team_game_keys % len(team_codes)
+    tg_fg3m = np.bincount(team_game, weights=games['fg3m'], minlength=len(team_game_keys))
+    tg_fg3a = np.bincount(team_game, weights=games['fg3a'], minlength=len(team_game_keys))
+    tg_date = np.zeros(len(team_game_keys), dtype=np.int32)
+    tg_date[team_game] = games['date_ordinal']
+
+    # Keys are sorted by game, so a game's two teams are adjacent
+    tg_opponent = np.full(len(team_game_keys), -1)
+    paired = np.r_[tg_game[1:] == tg_game[:-1], False]
+    first = np.flatnonzero(paired)
+    tg_opponent[first] = first + 1
+    tg_opponent[first + 1] = first
+
+    # What each team allowed in each game, accumulated in date order per team
+    has_opponent = tg_opponent >= 0
+    allowed_3pm = np.where(has_opponent, tg_fg3m[tg_opponent], 0.0)
+    allowed_3pa = np.where(has_opponent, tg_fg3a[tg_opponent], 0.0)
+
+    order = np.lexsort((tg_date, tg_team))
+    rank = _group_rank(tg_team[order])
+    prior_3pm = np.empty(len(order))
+    prior_3pa = np.empty(len(order))
+    prior_games = np.empty(len(order))
+    prior_3pm[order] = _exclusive_cumsum(allowed_3pm[order], rank)
+    prior_3pa[order] = _exclusive_cumsum(allowed_3pa[order], rank)
+    prior_games[order] = _exclusive_cumsum(has_opponent[order].astype(float), rank)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        allowed_pct = np.where(
+            (prior_games >= min_team_games) & (prior_3pa > 0),
+            prior_3pm / prior_3pa,
+            predictor.league_avg_3p_pct
+        )
+
+    # Same overall -> position split estimate the live scan uses
+    tg_defense = np.array([
+        predictor.defense_vector(pos_def.get_position_defense_stats(float(pct))) for pct in allowed_pct
+    ]).reshape(-1, 3)
+
+    opponent = tg_opponent[team_game]
+    defense = np.where((opponent >= 0)[:, None], tg_defense[opponent], np.nan) if n else np.zeros((0, 3))
+    opponent_team_id = np.where(opponent >= 0, team_codes[tg_team[opponent]], -1) if n else opponent
+    return defense, opponent_team_id
+
+
+def backtest(games, positions=None, predictor=None, pos_def=None, min_games=5, min_3pa=3.0, min_team_games=3):
+    """
+    Predict every player-game from what was known the morning of the game
+    (prior 10 games' 3PM, season 3PA to date, opponent defense to date) and
+    score it against the actual FG3M, all in one predict_batch call
+    Player-games with fewer than min_games prior games, under min_3pa 3PA to
+    date (the live filter) or without an identifiable opponent are skipped.
+    There is no injury history, so no injured-defender boosts are applied
+    positions: {player_id: position}, 'SG' for anyone missing
+    Returns: dict of arrays, one entry per scored player-game: the
+             predict_batch outputs plus its confidence_features
+    """
+    predictor = predictor or ThreePointPredictor()
+    pos_def = pos_def or SimplePositionDefense()
+    positions = positions or {}
+
+    rank = _group_rank(games['player_id'])
+
+    # Prior 10 games, most recent first, NaN before the player's first game
+    offsets = 1 + np.arange(10)
+    valid = rank[:, None] - offsets[None, :] >= 0
+    rows = np.clip(np.arange(len(rank))[:, None] - offsets[None, :], 0, None)
+    windows = np.where(valid, games['fg3m'][rows], np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        attempts = np.round(_exclusive_cumsum(games['fg3a'], rank) / rank, 1)
+
+    defense, opponent_team_id = opponent_defense_to_date(games, pos_def, predictor, min_team_games)
+
+    keep = (rank >= min_games) & (attempts >= min_3pa) & (opponent_team_id >= 0)
+    player_ids = games['player_id'][keep]
+    player_positions = [positions.get(int(player_id), 'SG') for player_id in player_ids]
+
+    predictions = predictor.predict_batch(windows[keep], attempts[keep], player_positions, defense[keep])
+    features = predictor.confidence_features(windows[keep], attempts[keep], player_positions, defense[keep])
+
+    return {
+        'player_id': player_ids,
+        'team_id': games['team_id'][keep],
+        'opponent_team_id': opponent_team_id[keep],
+        'game_id': games['game_id'][keep],
+        'date_ordinal': games['date_ordinal'][keep],
+        'position': np.array(player_positions),
+        'actual': games['fg3m'][keep],
+        **features,
+        **predictions,
+    }
+
+
+def _accuracy(predicted, actual):
+    """MAE, bias and hit rates for one slice of player-games"""
+    if not len(actual):
+        return {'count': 0}
+    errors = predicted - actual
+    return {
+        'count': int(len(actual)),
+        'mean_predicted': round(float(predicted.mean()), 3),
+        'mean_actual': round(float(actual.mean()), 3),
+        'mae': round(float(np.abs(errors).mean()), 3),
+        'bias': round(float(errors.mean()), 3),
+        # Player made at least the predicted number of threes (rounded)
+        'hit_rate': round(float((actual >= np.round(predicted)).mean()), 3),
+        'within_1_rate': round(float((np.abs(errors) <= 1).mean()), 3),
+    }
+
+
+def summarize(results):
+    """
+    Accuracy overall, per confidence tier and per prediction bucket, plus the
+    unadjusted last-10 average as a baseline for the defense adjustment
+    """
+    predicted = results['prediction']
+    actual = results['actual']
+
+    summary = {
+        'player_games': int(len(actual)),
+        'overall': _accuracy(predicted, actual),
+        'baseline_last_10_avg': _accuracy(results['last_10_avg'], actual),
+        'tiers': {tier: _accuracy(predicted[results['confidence_tier'] == tier],
+                                  actual[results['confidence_tier'] == tier]) for tier in TIERS},
+        'calibration': [],
+    }
+
+    bucket = np.digitize(predicted, PREDICTION_BINS[1:])
+    for i, low in enumerate(PREDICTION_BINS):
+        label = f"{low}-{PREDICTION_BINS[i + 1]}" if i + 1 < len(PREDICTION_BINS) else f"{low}+"
+        in_bucket = bucket == i
+        summary['calibration'].append({'bucket': label, **_accuracy(predicted[in_bucket], actual[in_bucket])})
+
+    return summary
+
+
+def print_report(summary):
+    overall = summary['overall']
+    print(f"\n{summary['player_games']} player-games backtested")
+    if not overall['count']:
+        return
+
+    baseline = summary['baseline_last_10_avg']
+    print(f"MAE: {overall['mae']:.3f} (last-10 average alone: {baseline['mae']:.3f}) | bias: {overall['bias']:+.3f}")
+    print(f"Hit rate: {overall['hit_rate']:.1%} | within 1 three: {overall['within_1_rate']:.1%}")
+
+    print(f"\n{'Tier':<8}{'Games':>8}{'Predicted':>11}{'Actual':>9}{'MAE':>8}{'Hit rate':>10}")
+    for tier, stats in summary['tiers'].items():
+        if stats['count']:
+            print(f"{tier:<8}{stats['count']:>8}{stats['mean_predicted']:>11.2f}{stats['mean_actual']:>9.2f}"
+                  f"{stats['mae']:>8.3f}{stats['hit_rate']:>10.1%}")
+
+    print(f"\n{'Predicted':<10}{'Games':>8}{'Mean':>8}{'Actual':>9}")
+    for stats in summary['calibration']:
+        if stats['count']:
+            print(f"{stats['bucket']:<10}{stats['count']:>8}{stats['mean_predicted']:>8.2f}"
+                  f"{stats['mean_actual']:>9.2f}")
+
+
+def load_season(fetcher, parser, season="2025-26"):
+    """(games, positions) for a season: the league game log plus the player index, two requests"""
+    response = fetcher.get_league_game_logs(season)
+    if not response:
+        return None, {}
+
+    index_response = fetcher.get_player_index(season)
+    positions = parser.parse_player_positions(index_response, id_key='PERSON_ID') if index_response else {}
+    return load_player_games(response), positions
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Backtest the prediction model over a season of game logs")
+    arg_parser.add_argument('--season', default="2025-26")
+    arg_parser.add_argument('--fixtures', default=None,
+                            help="fixtures JSON from benchmark.py instead of the API / response cache")
+    arg_parser.add_argument('--min-games', type=int, default=5, help="prior games required for a prediction")
+    arg_parser.add_argument('--min-3pa', type=float, default=3.0, help="3PA per game to date required")
+    arg_parser.add_argument('--confidence-config', metavar='PATH', default=None,
+                            help="confidence weights/thresholds JSON (e.g. from confidence_sweep.py)")
+    arg_parser.add_argument('--output', default=None, help="write the summary as JSON")
+    return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.fixtures:
+        from benchmark import ReplayFetcher, load_fixtures
+        fetcher = ReplayFetcher(load_fixtures(args.fixtures))
+    else:
+        fetcher = NBADataFetcher()
+
+    started = datetime.now()
+    games, positions = load_season(fetcher, NBADataParser(), args.season)
+    if games is None:
+        print("Could not fetch league game logs.")
+        raise SystemExit(1)
+    loaded = datetime.now()
+
+    predictor = ThreePointPredictor(load_confidence_params(args.confidence_config) if args.confidence_config else None)
+    results = backtest(games, positions, predictor=predictor, min_games=args.min_games, min_3pa=args.min_3pa)
+    summary = summarize(results)
+    finished = datetime.now()
+
+    print(f"Loaded {len(games['fg3m'])} player-games in {(loaded - started).total_seconds():.1f}s, "
+          f"backtested in {(finished - loaded).total_seconds():.2f}s")
+    print_report(summary)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'season': args.season, **summary}, f, indent=2)
+        print(f"\nWrote summary to {args.output}")
@@ -0,0 +1,253 @@
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from backtest import backtest, load_season
+from data_fetcher import NBADataFetcher
+from main import scan_slate
+from parser import NBADataParser
+from predictor import ThreePointPredictor
+from position_index import DEFAULT_INDEX_PATH, PlayerPositionIndex
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache, cache_dir_for
+from season_matrix import DEFAULT_MATRIX_DIR, SeasonStatsMatrix
+from shooter_filter import ShooterFilter
+from simple_position_defense import SimplePositionDefense
+
+CSV_FIELDS = [
+    'date', 'game_id', 'team', 'opponent', 'player', 'position', 'prediction', 'base_prediction',
+    'confidence_score', 'confidence_tier', 'last_5_avg', '3pa_per_game', 'injured_defenders', 'flags'
+]
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(nba_rate, espn_rate, threads, api_base_url=None, cache_path=DEFAULT_CACHE_PATH,
+                 index_path=DEFAULT_INDEX_PATH, matrix_path=DEFAULT_MATRIX_DIR):
+    """
+    Build one fetcher per process and memory-map the season matrix the parent wrote
+    The SQLite response cache is shared by every process, so rosters, team
+    defense and injuries fetched for one date are reused for the others;
+    the position index the parent built is loaded from index_path
+    """
+    NBADataFetcher.configure_rate_limits(nba_rate=nba_rate, espn_rate=espn_rate)
+    NBADataFetcher.configure_endpoints(nba_base_url=api_base_url, espn_base_url=api_base_url)
+
+    fetcher = NBADataFetcher(cache=ResponseCache(cache_path))
+    _worker.update(
+        fetcher=fetcher,
+        parser=NBADataParser(),
+        predictor=ThreePointPredictor(),
+        pos_def=SimplePositionDefense(),
+        position_index=PlayerPositionIndex(index_path),
+        season_matrix=SeasonStatsMatrix.open(matrix_path) if matrix_path else None,
+        shooter_filter=ShooterFilter(),
+        threads=threads
+    )
+
+
+def _scan_game(task):
+    """Worker: analyze one game, returning flat result rows"""
+    game_date, game = task
+    slate = scan_slate(_worker['fetcher'], _worker['parser'], _worker['predictor'], _worker['pos_def'],
+                       [game], workers=_worker['threads'], bulk_game_logs=False,
+                       position_index=_worker['position_index'], shooter_filter=_worker['shooter_filter'],
+                       season_matrix=_worker['season_matrix'])
+    return [
+        result_row(game_date, matchup['game'], side, result)
+        for matchup in slate
+        for side in matchup['sides']
+        for result in (side['results'] or [])
+    ]
+
+
+def result_row(game_date, game, side, result):
+    """Flat, JSON/CSV-friendly record of one analyze_player result"""
+    last_5 = result['stats']['last_5_3pm']
+    return {
+        'date': game_date,
+        'game_id': game['game_id'],
+        'team': side['team']['abbreviation'],
+        'opponent': side['opponent']['abbreviation'],
+        'player': result['name'],
+        'position': result['position'],
+        'prediction': round(float(result['prediction']), 2),
+        'base_prediction': round(float(result['base_prediction']), 2),
+        'confidence_score': int(result['confidence_score']),
+        'confidence_tier': result['confidence_tier'],
+        'last_5_avg': round(sum(last_5) / len(last_5), 2),
+        '3pa_per_game': float(result['stats']['3pa_per_game']),
+        'injured_defenders': '; '.join(result['injured_defenders']),
+        'flags': '; '.join(result['flags'])
+    }
+
+
+def date_range(start, days):
+    """'YYYY-MM-DD' strings for `days` consecutive dates from start"""
+    return [(start + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(days)]
+
+
+def collect_games(fetcher, parser, dates, include_final=False):
+    """[(date, game)] for every game on the given dates"""
+    tasks = []
+    for game_date in dates:
+        scoreboard = fetcher.get_games_for_date(game_date)
+        games = parser.parse_scoreboard(scoreboard, include_final=include_final) if scoreboard else []
+        print(f"{game_date}: {len(games)} games")
+        tasks.extend((game_date, game) for game in games)
+    return tasks
+
+
+def past_rows(fetcher, parser, dates):
+    """
+    Rows for finished games on past dates, predicted only from what was known
+    the morning of each game: backtest.backtest's prior games and opponent
+    defense to date, from one league game log (there is no injury history)
+    Returns: rows ordered by date, game, team and player
+    """
+    games, positions = load_season(fetcher, parser)
+    if games is None:
+        print("Could not fetch league game logs for past dates")
+        return []
+
+    results = backtest(games, positions)
+    ordinals = {datetime.strptime(game_date, '%Y-%m-%d').toordinal() for game_date in dates}
+
+    rows = []
+    for i in range(len(results['player_id'])):
+        if int(results['date_ordinal'][i]) not in ordinals:
+            continue
+        player = fetcher.find_player_by_id(int(results['player_id'][i]))
+        team = fetcher.find_team_by_id(int(results['team_id'][i]))
+        opponent = fetcher.find_team_by_id(int(results['opponent_team_id'][i]))
+        if not player or not team or not opponent:
+            continue
+        rows.append({
+            'date': date.fromordinal(int(results['date_ordinal'][i])).isoformat(),
+            'game_id': str(results['game_id'][i]),
+            'team': team['abbreviation'],
+            'opponent': opponent['abbreviation'],
+            'player': player['full_name'],
+            'position': str(results['position'][i]),
+            'prediction': round(float(results['prediction'][i]), 2),
+            'base_prediction': round(float(results['base_prediction'][i]), 2),
+            'confidence_score': int(results['confidence_score'][i]),
+            'confidence_tier': str(results['confidence_tier'][i]),
+            'last_5_avg': round(float(results['last_5_avg'][i]), 2),
+            '3pa_per_game': float(results['attempts'][i]),
+            'injured_defenders': '',
+            'flags': ''
+        })
+
+    rows.sort(key=lambda row: (row['date'], row['game_id'], row['team'], row['player']))
+    for game_date in sorted(dates):
+        print(f"{game_date}: {sum(row['date'] == game_date for row in rows)} as-of predictions")
+    return rows
+
+
+def batch_scan(dates, processes=4, threads=2, include_final=False, nba_rate=1.6, espn_rate=5.0,
+               api_base_url=None):
+    """
+    Scan every game on the given dates, one game per task across a process pool
+    include_final: also predict the finished games on dates before today, from
+                   data cut off at each game's date (see past_rows); today's
+                   finished games are never scanned, the season-to-date data
+                   already contains them
+    nba_rate / espn_rate: total requests/second, split evenly between processes
+    Returns: result rows ordered by date, game and roster order
+    """
+    NBADataFetcher.configure_endpoints(nba_base_url=api_base_url, espn_base_url=api_base_url)
+    cache_dir = cache_dir_for(api_base_url)
+    cache_path = os.path.join(cache_dir, os.path.basename(DEFAULT_CACHE_PATH))
+    index_path = os.path.join(cache_dir, os.path.basename(DEFAULT_INDEX_PATH))
+    matrix_path = os.path.join(cache_dir, os.path.basename(DEFAULT_MATRIX_DIR))
+    fetcher = NBADataFetcher(cache=ResponseCache(cache_path))
+    parser = NBADataParser()
+
+    today = date.today().isoformat()
+    past_dates = [game_date for game_date in dates if game_date < today]
+    rows = past_rows(fetcher, parser, past_dates) if include_final and past_dates else []
+
+    tasks = collect_games(fetcher, parser, [game_date for game_date in dates if game_date >= today])
+    if not tasks:
+        return rows
+
+    # Warm the shared response cache and the position index once so workers
+    # don't all request the league-wide data or per-player positions; the
+    # league game log goes into one season matrix every worker memory-maps
+    league_game_logs = fetcher.get_league_game_logs()
+    if league_game_logs:
+        SeasonStatsMatrix.from_league_game_logs(league_game_logs, path=matrix_path)
+    else:
+        print("Could not fetch league game logs; workers request each player's log")
+        matrix_path = None
+    fetcher.get_league_player_stats()
+    PlayerPositionIndex(index_path).ensure_built(fetcher, parser)
+
+    processes = max(1, min(processes, len(tasks)))
+    with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(nba_rate / processes, espn_rate / processes, threads, api_base_url, cache_path,
+                      index_path, matrix_path)
+    ) as executor:
+        for (game_date, game), game_rows in zip(tasks, executor.map(_scan_game, tasks)):
+            print(f"{game_date} {game['game_id']}: {len(game_rows)} predictions")
+            rows.extend(game_rows)
+
+    return rows
+
+
+def write_output(rows, path, meta=None):
+    """Write rows as CSV (*.csv) or JSON (anything else)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, 'w') as f:
+            json.dump({**(meta or {}), 'predictions': rows}, f, indent=2)
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Headless multi-date slate scan")
+    arg_parser.add_argument('--start', default=None, help="first date, YYYY-MM-DD (default: today)")
+    arg_parser.add_argument('--days', type=int, default=7, help="number of dates to scan")
+    arg_parser.add_argument('--processes', type=int, default=4, help="worker processes")
+    arg_parser.add_argument('--threads', type=int, default=2, help="threads per worker process")
+    arg_parser.add_argument('--include-final', action='store_true',
+                            help="also predict finished games on past dates, from data as of each date")
+    arg_parser.add_argument('--nba-rate', type=float, default=1.6, help="total stats.nba.com requests/second")
+    arg_parser.add_argument('--espn-rate', type=float, default=5.0, help="total ESPN requests/second")
+    arg_parser.add_argument('--api-base-url', metavar='URL', default=None,
+                            help="send requests to URL (e.g. the local stand_in_server.py)")
+    arg_parser.add_argument('--output', default=None,
+                            help="output path, .csv or .json (default: projections_<start>_<days>d.json)")
+    return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = datetime.strptime(args.start, '%Y-%m-%d').date() if args.start else date.today()
+    dates = date_range(start, max(1, args.days))
+
+    started = datetime.now()
+    rows = batch_scan(dates, processes=args.processes, threads=args.threads, include_final=args.include_final,
+                      nba_rate=args.nba_rate, espn_rate=args.espn_rate, api_base_url=args.api_base_url)
+
+    output = args.output or f"projections_{dates[0]}_{len(dates)}d.json"
+    write_output(rows, output, meta={
+        'generated_at': started.isoformat(timespec='seconds'),
+        'start': dates[0],
+        'end': dates[-1],
+        'games': len({(row['date'], row['game_id']) for row in rows})
+    })
+    print(f"Wrote {len(rows)} predictions to {output} in {(datetime.now() - started).total_seconds():.1f}s")
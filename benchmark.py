@@ -0,0 +1,530 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from data_fetcher import NBADataFetcher
+from instrumentation import Metrics
+from main import analyze_player, scan_slate, select_players
+from parser import NBADataParser
+from position_index import PlayerPositionIndex
+from predictor import ThreePointPredictor
+from response_cache import ResponseCache
+from shooter_filter import ShooterFilter
+from simple_position_defense import SimplePositionDefense
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results')
+
+# The scoreboard is keyed by date, so replay serves it regardless of params
+ANY_PARAMS = '*'
+
+
+def fixture_key(endpoint, params):
+    """Key of a recorded response, e.g. 'commonteamroster|{"season": "2025-26", "team_id": 1610612737}'"""
+    return f"{endpoint}|{json.dumps(params, sort_keys=True, default=str)}"
+
+
+class ReplayFetcher(NBADataFetcher):
+    """
+    NBADataFetcher that answers every request from recorded JSON fixtures
+    (no network, no rate limiter), sleeping `latency` seconds (+/- jitter)
+    per request to emulate the network
+    cache: optional ResponseCache checked before replaying, like the live fetcher;
+           cache hits are not counted as requests
+    With record=True it calls the live APIs instead and stores each response
+    """
+
+    def __init__(self, fixtures=None, latency=0.0, jitter=0.0, record=False, seed=0, metrics=None, cache=None):
+        super().__init__(cache=None if record else cache, use_cache=False, metrics=metrics)
+        self.fixtures = fixtures if fixtures is not None else {}
+        self.latency = latency
+        self.jitter = jitter
+        self.record = record
+        self._random = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self.request_counts = {}
+        self.missing = 0
+
+    def _request(self, endpoint, params, fetch, limiter=None):
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params)
+            if self.metrics.enabled:
+                self.metrics.record_cache(endpoint, cached is not None)
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+        if self.record:
+            response = super()._request(endpoint, params, fetch, limiter)
+            if response is not None:
+                with self._lock:
+                    self.fixtures[fixture_key(endpoint, params)] = response
+                    if endpoint == 'scoreboardv2':
+                        self.fixtures[fixture_key(endpoint, ANY_PARAMS)] = response
+            return response
+
+        if self.latency or self.jitter:
+            with self._lock:
+                delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            time.sleep(delay)
+            if self.metrics.enabled:
+                self.metrics.record_request(endpoint, delay)
+
+        response = self.fixtures.get(fixture_key(endpoint, params))
+        if response is None:
+            response = self.fixtures.get(fixture_key(endpoint, ANY_PARAMS))
+        if response is None:
+            with self._lock:
+                self.missing += 1
+        elif self.cache is not None:
+            self.cache.set(endpoint, params, response)
+        return response
+
+    def total_requests(self):
+        with self._lock:
+            return sum(self.request_counts.values())
+
+
+def _season_dates(n_games, season_start=date(2025, 10, 22)):
+    """n_games dates every other day from opening night, newest first"""
+    return [season_start + timedelta(days=2 * i) for i in range(n_games)][::-1]
+
+
+def _round_robin(n_teams, rounds):
+    """Pairings of team indexes per round (circle method), each team plays once a round"""
+    others = list(range(1, n_teams))
+    schedule = []
+    for _ in range(rounds):
+        lineup = [0] + others
+        schedule.append([(lineup[i], lineup[n_teams - 1 - i]) for i in range(n_teams // 2)])
+        others = others[-1:] + others[:-1]
+    return schedule
+
+
+def make_synthetic_fixtures(n_games=15, roster_size=13, games_played=20, season="2025-26", seed=0):
+    """
+    Generate fixtures for an n_games night (30 teams when n_games=15):
+    scoreboard, rosters, per-player and league game logs, player info,
+    player index, league player totals, team defense, team game logs,
+    box scores and ESPN injuries, shaped like the real APIs
+    Past games follow a round-robin schedule, so game logs, team logs and
+    box scores agree; players are real static player IDs so name lookups work
+    """
+    rng = random.Random(seed)
+    all_teams = sorted(_static_teams(), key=lambda t: t['id'])
+    active_players = sorted((p for p in _static_players() if p['is_active']), key=lambda p: p['id'])
+    rng.shuffle(active_players)
+
+    teams = all_teams[:2 * n_games]
+    positions = ['G', 'G', 'G-F', 'F', 'F', 'F-C', 'C']
+    position_names = {'G': 'Guard', 'G-F': 'Guard-Forward', 'F': 'Forward', 'F-C': 'Forward-Center', 'C': 'Center'}
+    dates = _season_dates(games_played)  # newest first
+    predictor = ThreePointPredictor()
+
+    fixtures = {}
+    game_header = []
+    index_rows = []
+
+    for i in range(n_games):
+        home, away = teams[2 * i], teams[2 * i + 1]
+        game_header.append([f"00225{i:05d}", home['id'], away['id'], f"{7 + i % 4}:00 pm ET"])
+
+    rosters = []
+    volumes = {}
+    for team_index, team in enumerate(teams):
+        roster = active_players[team_index * roster_size:(team_index + 1) * roster_size]
+        rosters.append(roster)
+        roster_rows = []
+
+        for player in roster:
+            position = rng.choice(positions)
+            roster_rows.append([team['id'], player['id'], player['full_name'], position])
+            index_rows.append([player['id'], team['id'], position])
+            # Shooters from ~0.5 to ~9 3PA per game
+            volumes[player['id']] = rng.uniform(0.5, 9.0)
+
+            fixtures[fixture_key('commonplayerinfo', {'player_id': player['id']})] = {'resultSets': [{
+                'name': 'CommonPlayerInfo',
+                'headers': ['PERSON_ID', 'DISPLAY_FIRST_LAST', 'POSITION'],
+                'rowSet': [[player['id'], player['full_name'], position_names[position]]]
+            }]}
+
+        fixtures[fixture_key('commonteamroster', {'team_id': team['id'], 'season': season})] = {'resultSets': [{
+            'name': 'CommonTeamRoster',
+            'headers': ['TeamID', 'PLAYER_ID', 'PLAYER', 'POSITION'],
+            'rowSet': roster_rows
+        }]}
+
+        fixtures[fixture_key('teamdashboardbygeneralsplits',
+                             {'team_id': team['id'], 'season': season, 'measure_type': 'Opponent'})] = {
+            'resultSets': [{
+                'name': 'OverallTeamDashboard',
+                'headers': ['GROUP_SET', 'FG3_PCT'],
+                'rowSet': [['Overall', round(rng.uniform(0.33, 0.39), 3)]]
+            }]
+        }
+
+        # Roughly a third of teams are missing one of their listed perimeter defenders
+        injuries = []
+        defenders = predictor.perimeter_defenders.get(team['abbreviation'], [])
+        if defenders and rng.random() < 0.35:
+            injuries.append({'status': 'OUT', 'athlete': {'displayName': rng.choice(defenders)}})
+        injuries.append({'status': 'Day-To-Day', 'athlete': {'displayName': roster[0]['full_name']}})
+        fixtures[fixture_key('espn_injuries', {'team': team['abbreviation'].lower()})] = {'injuries': injuries}
+
+    # Completed games, newest round first
+    player_rows = {player_id: [] for player_id in volumes}
+    league_rows = []
+    team_rows = {team['id']: [] for team in teams}
+    league_team_rows = []
+
+    for round_number, pairings in enumerate(_round_robin(len(teams), games_played)):
+        game_date = dates[round_number]
+        for pair_number, (home_index, away_index) in enumerate(pairings):
+            game_id = f"00225{round_number:03d}{pair_number:02d}"
+            home, away = teams[home_index], teams[away_index]
+            home_won = rng.random() < 0.5
+
+            box_rows = []
+            for team, team_index, won in [(home, home_index, home_won), (away, away_index, not home_won)]:
+                wl = 'W' if won else 'L'
+                team_rows[team['id']].append([team['id'], game_id, game_date.strftime('%b %d, %Y').upper(), wl])
+                league_team_rows.append([team['id'], game_id, game_date.isoformat(), wl])
+
+                for player in rosters[team_index]:
+                    fg3a = max(0, int(rng.gauss(volumes[player['id']], 2.0)))
+                    fg3m = sum(rng.random() < 0.36 for _ in range(fg3a))
+                    minutes = round(rng.uniform(12, 38), 1)
+                    player_rows[player['id']].append(
+                        [game_id, game_date.strftime('%b %d, %Y').upper(), fg3m, fg3a, minutes]
+                    )
+                    league_rows.append(
+                        [player['id'], team['id'], game_id, game_date.isoformat() + 'T00:00:00', fg3m, fg3a, minutes]
+                    )
+                    box_rows.append([game_id, team['id'], player['id'], fg3m, fg3a])
+
+            fixtures[fixture_key('boxscoretraditionalv2', {'game_id': game_id})] = {'resultSets': [
+                {'name': 'PlayerStats', 'headers': ['GAME_ID', 'TEAM_ID', 'PLAYER_ID', 'FG3M', 'FG3A'],
+                 'rowSet': box_rows},
+                {'name': 'TeamStats', 'headers': ['GAME_ID', 'TEAM_ID'],
+                 'rowSet': [[game_id, home['id']], [game_id, away['id']]]},
+                {'name': 'LineScore', 'headers': ['GAME_ID', 'TEAM_ID'],
+                 'rowSet': [[game_id, home['id']], [game_id, away['id']]]},
+            ]}
+
+    for player_id, rows in player_rows.items():
+        fixtures[fixture_key('playergamelog', {'player_id': player_id, 'season': season})] = {'resultSets': [{
+            'name': 'PlayerGameLog',
+            'headers': ['Game_ID', 'GAME_DATE', 'FG3M', 'FG3A', 'MIN'],
+            'rowSet': rows
+        }]}
+    for team_id, rows in team_rows.items():
+        fixtures[fixture_key('teamgamelog', {'team_id': team_id, 'season': season})] = {'resultSets': [{
+            'name': 'TeamGameLog',
+            'headers': ['Team_ID', 'Game_ID', 'GAME_DATE', 'WL'],
+            'rowSet': rows
+        }]}
+
+    fixtures[fixture_key('scoreboardv2', ANY_PARAMS)] = {'resultSets': [{
+        'name': 'GameHeader',
+        'headers': ['GAME_ID', 'HOME_TEAM_ID', 'VISITOR_TEAM_ID', 'GAME_STATUS_TEXT'],
+        'rowSet': game_header
+    }]}
+    fixtures[fixture_key('playergamelogs', {'season': season})] = {'resultSets': [{
+        'name': 'PlayerGameLogs',
+        'headers': ['PLAYER_ID', 'TEAM_ID', 'GAME_ID', 'GAME_DATE', 'FG3M', 'FG3A', 'MIN'],
+        'rowSet': league_rows
+    }]}
+    fixtures[fixture_key('leaguegamelog', {'season': season, 'player_or_team': 'T'})] = {'resultSets': [{
+        'name': 'LeagueGameLog',
+        'headers': ['TEAM_ID', 'GAME_ID', 'GAME_DATE', 'WL'],
+        'rowSet': league_team_rows
+    }]}
+    totals = {}
+    for player_id, team_id, _, _, fg3m, fg3a, _ in league_rows:
+        player = totals.setdefault(player_id, [player_id, team_id, 0, 0, 0])
+        player[2] += 1
+        player[3] += fg3m
+        player[4] += fg3a
+    fixtures[fixture_key('leaguedashplayerstats', {'season': season})] = {'resultSets': [{
+        'name': 'LeagueDashPlayerStats',
+        'headers': ['PLAYER_ID', 'TEAM_ID', 'GP', 'FG3M', 'FG3A'],
+        'rowSet': list(totals.values())
+    }]}
+    fixtures[fixture_key('playerindex', {'season': season})] = {'resultSets': [{
+        'name': 'PlayerIndex',
+        'headers': ['PERSON_ID', 'TEAM_ID', 'POSITION'],
+        'rowSet': index_rows
+    }]}
+
+    return fixtures
+
+
+def _static_teams():
+    from nba_api.stats.static import teams
+    return teams.get_teams()
+
+
+def _static_players():
+    from nba_api.stats.static import players
+    return players.get_players()
+
+
+def load_fixtures(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(data, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(fixtures, latency=0.0, jitter=0.0, mode='sequential', workers=4, metrics=False):
+    """
+    Replay a full slate scan and time each stage
+    mode: 'sequential' runs scoreboard -> rosters -> analyze_player per player,
+          'scan' runs main.scan_slate configured like main.py (bulk game logs, shooter
+          pre-filter, position index, a response cache starting cold, `workers` threads)
+    metrics: also include the instrumentation summary (per analyze_player stage)
+    Returns: result dict (stages in seconds, requests, players/second)
+    """
+    # main.py scans through the response cache; an in-memory one keeps each run cold and isolated
+    cache = ResponseCache(':memory:') if mode == 'scan' else None
+    fetcher = ReplayFetcher(fixtures, latency=latency, jitter=jitter, metrics=Metrics() if metrics else None,
+                            cache=cache)
+    parser = NBADataParser()
+    predictor = ThreePointPredictor()
+    pos_def = SimplePositionDefense()
+
+    stages = {}
+    started = time.perf_counter()
+
+    stage_start = time.perf_counter()
+    scoreboard = fetcher.get_todays_games()
+    games = parser.parse_scoreboard(scoreboard) if scoreboard else []
+    stages['scoreboard'] = time.perf_counter() - stage_start
+
+    players_analyzed = 0
+    predictions = []
+
+    if mode == 'scan':
+        stage_start = time.perf_counter()
+        shooter_filter = ShooterFilter()
+        slate = scan_slate(fetcher, parser, predictor, pos_def, games, workers=workers,
+                           position_index=PlayerPositionIndex(path=None), shooter_filter=shooter_filter)
+        stages['scan_slate'] = time.perf_counter() - stage_start
+
+        for matchup in slate:
+            for side in matchup['sides']:
+                if side['results'] is None:
+                    continue
+                predictions.extend(side['results'])
+
+        # Every player the filter selected went through analyze_player
+        players_analyzed = shooter_filter.summary()['selected']
+    else:
+        stage_start = time.perf_counter()
+        sides = []
+        for game in games:
+            home_team = fetcher.find_team_by_id(game['home_team_id'])
+            away_team = fetcher.find_team_by_id(game['visitor_team_id'])
+            if not home_team or not away_team:
+                continue
+            for team, opponent in [(home_team, away_team), (away_team, home_team)]:
+                roster_response = fetcher.get_team_roster(team['id'])
+                player_ids = parser.parse_team_roster(roster_response) if roster_response else []
+                sides.append((opponent, player_ids[:10]))
+        stages['rosters'] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        for opponent, player_ids in sides:
+            for player_id in player_ids:
+                player_obj = fetcher.find_player_by_id(player_id)
+                if not player_obj:
+                    continue
+                players_analyzed += 1
+                result = analyze_player(fetcher, parser, predictor, pos_def, player_id, player_obj['full_name'],
+                                        opponent['id'], opponent['abbreviation'])
+                if result:
+                    predictions.append(result)
+        stages['analyze_players'] = time.perf_counter() - stage_start
+
+    total = time.perf_counter() - started
+
+    result = {
+        'commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'config': {'mode': mode, 'workers': workers if mode == 'scan' else 1,
+                   'latency': latency, 'jitter': jitter, 'games': len(games)},
+        'stages': {name: round(seconds, 4) for name, seconds in stages.items()},
+        'total_seconds': round(total, 4),
+        'requests': fetcher.total_requests(),
+        'requests_by_endpoint': dict(sorted(fetcher.request_counts.items())),
+        'missing_fixtures': fetcher.missing,
+        'players_analyzed': players_analyzed,
+        'predictions': len(predictions),
+        'high_confidence': sum(1 for p in predictions if p['confidence_tier'] == 'HIGH'),
+        'players_per_second': round(players_analyzed / total, 2) if total > 0 else None
+    }
+    if metrics:
+        result['metrics'] = fetcher.metrics.summary()
+    return result
+
+
+def compare(baseline, current):
+    """Print stage-by-stage timing changes between two result dicts"""
+    print(f"Baseline {baseline.get('commit')} vs current {current.get('commit')}:")
+    for name in sorted(set(baseline['stages']) | set(current['stages'])):
+        before, after = baseline['stages'].get(name), current['stages'].get(name)
+        if before is None or after is None:
+            print(f"  {name:<16} {before!s:>9} -> {after!s:>9}")
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"  {name:<16} {before:9.3f}s -> {after:9.3f}s ({change:+.1f}%)")
+    print(f"  {'total':<16} {baseline['total_seconds']:9.3f}s -> {current['total_seconds']:9.3f}s")
+    print(f"  {'requests':<16} {baseline['requests']:>9} -> {current['requests']:>9}")
+    print(f"  {'players/sec':<16} {baseline['players_per_second']!s:>9} -> {current['players_per_second']!s:>9}")
+
+
+def measure_startup(runs=5, main_args=()):
+    """
+    Time-to-first-prompt of main.py: launch it, wait for the menu prompt on
+    stdout, then quit. Includes interpreter start, imports and setup
+    Returns: result dict (seconds per run, median, min)
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    prompt = 'Select option'
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-u', script, *main_args], stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, text=True)
+        # The prompt has no trailing newline, so read character by character
+        output = ''
+        while not output.endswith(prompt):
+            char = process.stdout.read(1)
+            if not char:
+                break
+            output += char
+        elapsed = time.perf_counter() - started
+        process.communicate('4\n', timeout=30)
+
+        if not output.endswith(prompt):
+            raise RuntimeError(f"main.py exited before showing the menu:\n{output}")
+        timings.append(round(elapsed, 4))
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'mode': 'startup',
+        'runs': timings,
+        'median_seconds': round(statistics.median(timings), 4),
+        'min_seconds': min(timings),
+    }
+
+
+def record_fixtures(path, days_ahead=0):
+    """Run a live sequential scan and save every response as fixtures"""
+    fetcher = ReplayFetcher(record=True)
+    parser = NBADataParser()
+    predictor = ThreePointPredictor()
+    pos_def = SimplePositionDefense()
+
+    # League-wide responses read by the shooter pre-filter and the position index,
+    # so a replayed scan (or the stand-in server) selects the same players
+    fetcher.get_player_index()
+    shooter_filter = ShooterFilter()
+    shooter_filter.ensure_built(fetcher, parser)  # records leaguedashplayerstats
+
+    scoreboard = fetcher.get_todays_games(days_ahead)
+    games = parser.parse_scoreboard(scoreboard) if scoreboard else []
+    for game in games:
+        home_team = fetcher.find_team_by_id(game['home_team_id'])
+        away_team = fetcher.find_team_by_id(game['visitor_team_id'])
+        if not home_team or not away_team:
+            continue
+        for team, opponent in [(home_team, away_team), (away_team, home_team)]:
+            roster_response = fetcher.get_team_roster(team['id'])
+            player_ids = parser.parse_team_roster(roster_response) if roster_response else []
+            for player_id in select_players(player_ids, shooter_filter):
+                player_obj = fetcher.find_player_by_id(player_id)
+                if player_obj:
+                    analyze_player(fetcher, parser, predictor, pos_def, player_id, player_obj['full_name'],
+                                   opponent['id'], opponent['abbreviation'])
+    fetcher.get_league_game_logs()
+
+    save_json(fetcher.fixtures, path)
+    print(f"Recorded {len(fetcher.fixtures)} responses for {len(games)} games to {path}")
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Offline slate scan benchmark (record/replay)")
+    arg_parser.add_argument('--fixtures', help="recorded fixtures JSON (default: synthetic 15-game night)")
+    arg_parser.add_argument('--record', metavar='PATH', help="record today's live slate to PATH and exit")
+    arg_parser.add_argument('--generate', metavar='PATH', help="write synthetic fixtures to PATH and exit")
+    arg_parser.add_argument('--games', type=int, default=15, help="games in the synthetic slate")
+    arg_parser.add_argument('--latency', type=float, default=0.05, help="seconds per replayed request")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="+/- seconds added to the latency")
+    arg_parser.add_argument('--mode', choices=['sequential', 'scan'], default='sequential')
+    arg_parser.add_argument('--workers', type=int, default=4, help="threads for --mode scan")
+    arg_parser.add_argument('--output', help="result JSON path (default: benchmark_results/<commit>_<mode>.json)")
+    arg_parser.add_argument('--metrics', action='store_true', help="include per-stage instrumentation")
+    arg_parser.add_argument('--startup', action='store_true',
+                            help="measure main.py's time to the first menu prompt instead of a scan")
+    arg_parser.add_argument('--runs', type=int, default=5, help="launches for --startup")
+    arg_parser.add_argument('--compare', metavar='PATH', help="earlier result JSON to compare against")
+    return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.record:
+        record_fixtures(args.record)
+    elif args.generate:
+        save_json(make_synthetic_fixtures(n_games=args.games), args.generate)
+        print(f"Wrote synthetic fixtures for {args.games} games to {args.generate}")
+    elif args.startup:
+        result = measure_startup(runs=args.runs)
+        print(json.dumps(result, indent=2))
+        if args.output:
+            save_json(result, args.output)
+            print(f"Saved to {args.output}")
+    else:
+        fixtures = load_fixtures(args.fixtures) if args.fixtures else make_synthetic_fixtures(n_games=args.games)
+        result = run_benchmark(fixtures, latency=args.latency, jitter=args.jitter,
+                               mode=args.mode, workers=args.workers, metrics=args.metrics)
+
+        output = args.output or os.path.join(
+            DEFAULT_RESULTS_DIR, f"{result['commit'] or 'local'}_{args.mode}.json"
+        )
+        save_json(result, output)
+
+        print(json.dumps(result, indent=2))
+        print(f"Saved to {output}")
+
+        if args.compare:
+            compare(load_fixtures(args.compare), result)
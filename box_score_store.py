@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BoxScoreStore:
+    """
+    Process-wide box scores keyed by game_id
+    Each box score holds both teams, so every team's defense calculation
+    shares one download per game; concurrent requests for the same game
+    wait on a single in-flight fetch
+    """
+
+    def __init__(self):
+        self.box_scores = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+
+    def get(self, fetcher, game_id):
+        """Box score dict for a game, or None if it could not be fetched"""
+        with self._lock:
+            if game_id in self.box_scores:
+                self.hits += 1
+                return self.box_scores[game_id]
+
+            future = self._in_flight.get(game_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[game_id] = future
+
+        if not owner:
+            return future.result()
+
+        box_data = None
+        try:
+            box_data = fetcher.get_box_score(game_id)
+        finally:
+            with self._lock:
+                self.fetches += 1
+                if box_data is not None:
+                    self.box_scores[game_id] = box_data
+                del self._in_flight[game_id]
+            future.set_result(box_data)
+
+        return box_data
+
+    def prefetch(self, fetcher, game_ids, workers=4):
+        """Fetch every missing game concurrently (still bounded by the fetcher's rate limiter)"""
+        with self._lock:
+            missing = list(dict.fromkeys(g for g in game_ids if g not in self.box_scores))
+
+        if not missing:
+            return 0
+
+        if workers > 1 and len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda game_id: self.get(fetcher, game_id), missing))
+        else:
+            for game_id in missing:
+                self.get(fetcher, game_id)
+
+        return len(missing)
+
+
+# Shared by every PositionDefenseCalculator in the process
+shared_box_scores = BoxScoreStore()
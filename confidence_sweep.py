@@ -0,0 +1,236 @@
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from backtest import backtest, load_season
+from data_fetcher import NBADataFetcher
+from parser import NBADataParser
+from predictor import DEFAULT_CONFIDENCE_PARAMS, ThreePointPredictor
+
+# Values tried for each knob; volume/consistency weights expand to the same
+# full / 2/3 / 1/3 and full / half steps the defaults use
+DEFAULT_GRID = {
+    'recent_weight': [25, 30, 35, 40, 45],
+    'matchup_weight': [20, 30, 40],
+    'volume_weight': [10, 15, 20],
+    'volume_cutoffs': [[5, 3, 2], [6, 4, 2], [7, 5, 3]],
+    'consistency_weight': [5, 10, 15],
+    'variance_cutoffs': [[1.0, 2.0], [1.5, 2.5], [2.0, 3.0]],
+    'tier_thresholds': [[60, 40], [65, 45], [70, 50], [75, 55]],
+}
+
+TIER_NAMES = ['LOW', 'MEDIUM', 'HIGH']
+
+# Configurations evaluated per array operation; bounds memory at ~chunk x player-games
+CHUNK_SIZE = 128
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+def expand_grid(grid=None):
+    """Every combination of the grid as a full confidence params dict"""
+    grid = grid or DEFAULT_GRID
+    keys = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        choice = dict(zip(keys, values))
+        volume, consistency = choice.pop('volume_weight'), choice.pop('consistency_weight')
+        configs.append({
+            **DEFAULT_CONFIDENCE_PARAMS,
+            **choice,
+            'volume_points': [volume, volume * 2 / 3, volume / 3],
+            'consistency_points': [consistency, consistency / 2],
+        })
+    return configs
+
+
+def _stack(configs):
+    """Params for C configs as (C, 1) arrays, so score_confidence broadcasts to (C, N)"""
+    def column(values):
+        return np.array(values, dtype=float)[:, None]
+
+    stacked = {}
+    for key in ('recent_weight', 'matchup_weight', 'injury_points'):
+        stacked[key] = column([config[key] for config in configs])
+    for key in ('volume_cutoffs', 'volume_points', 'variance_cutoffs', 'consistency_points', 'tier_thresholds'):
+        stacked[key] = [column([config[key][i] for config in configs]) for i in range(len(configs[0][key]))]
+    return stacked
+
+
+def evaluate(features, hits, configs, predictor=None, min_tier_share=0.02):
+    """
+    Score every player-game under each config and measure tier calibration
+    The confidence score is read as a hit probability (score / 100); a tier's
+    calibration error is the gap between its mean score and its hit rate, and
+    'calibration_error' is that gap averaged over player-games (ECE by tier).
+    A config is 'valid' if every tier holds at least min_tier_share of the
+    games and hit rates rise from LOW to MEDIUM to HIGH
+    Returns: one metrics dict per config
+    """
+    predictor = predictor or ThreePointPredictor()
+    hits = np.asarray(hits, dtype=float)
+    n = len(hits)
+    injured_out = np.zeros(n, dtype=int)
+
+    results = []
+    for start in range(0, len(configs), CHUNK_SIZE):
+        chunk = configs[start:start + CHUNK_SIZE]
+        params = _stack(chunk)
+        scores = predictor.score_confidence(features, injured_out, params)  # (C, N)
+
+        high, medium = params['tier_thresholds']
+        tier = (scores >= medium).astype(np.int8) + (scores >= high)
+
+        counts, hit_rates, mean_scores = [], [], []
+        for t in range(len(TIER_NAMES)):
+            in_tier = tier == t
+            count = in_tier.sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                hit_rates.append((in_tier * hits).sum(axis=1) / count)
+                mean_scores.append(np.where(in_tier, scores, 0).sum(axis=1) / count / 100)
+            counts.append(count)
+
+        counts = np.array(counts)  # (3, C)
+        hit_rates = np.array(hit_rates)
+        mean_scores = np.array(mean_scores)
+        calibration_error = np.nansum(counts / max(n, 1) * np.abs(mean_scores - hit_rates), axis=0)
+        ordered = (hit_rates[2] > hit_rates[1]) & (hit_rates[1] > hit_rates[0])
+        valid = ordered & (counts.min(axis=0) >= min_tier_share * n)
+
+        for i, config in enumerate(chunk):
+            results.append({
+                'params': config,
+                'calibration_error': round(float(calibration_error[i]), 4),
+                'valid': bool(valid[i]),
+                'tiers': {
+                    name: {
+                        'count': int(counts[t, i]),
+                        'hit_rate': None if counts[t, i] == 0 else round(float(hit_rates[t, i]), 4),
+                        'mean_score': None if counts[t, i] == 0 else round(float(mean_scores[t, i]) * 100, 1),
+                    }
+                    for t, name in enumerate(TIER_NAMES)
+                },
+            })
+    return results
+
+
+def _init_worker(features, hits, min_tier_share):
+    _worker.update(features=features, hits=hits, min_tier_share=min_tier_share,
+                   predictor=ThreePointPredictor())
+
+
+def _evaluate_chunk(configs):
+    """Worker: evaluate one slice of the grid"""
+    return evaluate(_worker['features'], _worker['hits'], configs, _worker['predictor'], _worker['min_tier_share'])
+
+
+def rank_configs(results):
+    """Valid configs first, then by calibration error, then by HIGH tier hit rate"""
+    return sorted(results, key=lambda r: (not r['valid'], r['calibration_error'],
+                                          -(r['tiers']['HIGH']['hit_rate'] or 0)))
+
+
+def sweep(results_backtest, configs, processes=None, min_tier_share=0.02):
+    """
+    Evaluate configs over a backtest's player-games across a process pool
+    Returns: metrics per config, best first
+    """
+    features = {key: results_backtest[key] for key in ('last_5_avg', 'opp_3p_allowed', 'attempts', 'variance')}
+    # Hit: made at least the (rounded) predicted number of threes, as in backtest.py
+    hits = results_backtest['actual'] >= np.round(results_backtest['prediction'])
+
+    processes = processes or os.cpu_count() or 1
+    per_task = max(CHUNK_SIZE, -(-len(configs) // (4 * processes)))
+    tasks = [configs[i:i + per_task] for i in range(0, len(configs), per_task)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(features, hits, min_tier_share)) as executor:
+        for chunk_results in executor.map(_evaluate_chunk, tasks):
+            results.extend(chunk_results)
+
+    return rank_configs(results)
+
+
+def describe(params):
+    return (f"recent {params['recent_weight']}, matchup {params['matchup_weight']}, "
+            f"volume {params['volume_points'][0]:g} @ {params['volume_cutoffs']}, "
+            f"consistency {params['consistency_points'][0]:g} @ {params['variance_cutoffs']}, "
+            f"tiers {params['tier_thresholds']}")
+
+
+def print_ranking(ranked, top=10):
+    print(f"\n{'#':>3} {'ECE':>7} {'HIGH':>13} {'MEDIUM':>13} {'LOW':>13}  params")
+    for i, result in enumerate(ranked[:top], 1):
+        tiers = [result['tiers'][name] for name in ('HIGH', 'MEDIUM', 'LOW')]
+        cells = ' '.join(f"{t['count']:>6}/{(t['hit_rate'] or 0):>5.1%}" for t in tiers)
+        marker = '' if result['valid'] else ' (invalid)'
+        print(f"{i:>3} {result['calibration_error']:>7.4f} {cells}  {describe(result['params'])}{marker}")
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Sweep calculate_confidence weights and thresholds")
+    arg_parser.add_argument('--season', default="2025-26")
+    arg_parser.add_argument('--fixtures', default=None,
+                            help="fixtures JSON from benchmark.py instead of the API / response cache")
+    arg_parser.add_argument('--grid', default=None, help="JSON file overriding DEFAULT_GRID entries")
+    arg_parser.add_argument('--processes', type=int, default=None, help="worker processes (default: all cores)")
+    arg_parser.add_argument('--min-tier-share', type=float, default=0.02,
+                            help="smallest share of player-games each tier must hold")
+    arg_parser.add_argument('--top', type=int, default=10, help="configs to print")
+    arg_parser.add_argument('--output', default='confidence_params.json',
+                            help="where to write the winning params (load with --confidence-config)")
+    arg_parser.add_argument('--report', default=None, help="also write the full ranking as JSON")
+    return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.fixtures:
+        from benchmark import ReplayFetcher, load_fixtures
+        fetcher = ReplayFetcher(load_fixtures(args.fixtures))
+    else:
+        fetcher = NBADataFetcher()
+
+    grid = dict(DEFAULT_GRID)
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+
+    started = datetime.now()
+    games, positions = load_season(fetcher, NBADataParser(), args.season)
+    if games is None:
+        print("Could not fetch league game logs.")
+        raise SystemExit(1)
+
+    results_backtest = backtest(games, positions)
+    configs = expand_grid(grid)
+    print(f"Sweeping {len(configs)} configs over {len(results_backtest['actual'])} player-games...")
+
+    ranked = sweep(results_backtest, configs, processes=args.processes, min_tier_share=args.min_tier_share)
+    print_ranking(ranked, args.top)
+
+    default = next((r for r in ranked if r['params'] == DEFAULT_CONFIDENCE_PARAMS), None)
+    if default:
+        print(f"\nCurrent defaults rank #{ranked.index(default) + 1} (ECE {default['calibration_error']:.4f})")
+
+    best = ranked[0]
+    if not best['valid']:
+        print("\nNo config met the tier size/ordering requirements; not writing params.")
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(best['params'], f, indent=2)
+        print(f"\nWrote best params to {args.output}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'season': args.season, 'grid': grid, 'ranking': ranked}, f, indent=2)
+
+    print(f"Done in {(datetime.now() - started).total_seconds():.1f}s")
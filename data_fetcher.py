@@ -1,72 +1,332 @@
-from nba_api.stats.endpoints import playergamelog, commonplayerinfo, teamdashboardbygeneralsplits, commonteamroster, \
-    scoreboardv2, leaguedashptdefend
-from nba_api.stats.static import players, teams
+import threading
 import time
 from datetime import datetime, timedelta
 
+from injury_client import InjuryClient
+from instrumentation import NULL_METRICS
+from player_search import PlayerSearchIndex
+from rate_limiter import RateLimiter, ThrottledError
+from response_cache import ResponseCache
+
 
 class NBADataFetcher:
-    def __init__(self):
-        self.all_players = players.get_players()
-        self.all_teams = teams.get_teams()
+    # Shared by every fetcher and thread in the process
+    nba_limiter = RateLimiter('nba_stats', rate=1.6, burst=2)
+    espn_limiter = RateLimiter('espn', rate=5.0, burst=5)
+
+    espn_base_url = "https://site.api.espn.com"
+
+    @classmethod
+    def configure_rate_limits(cls, nba_rate=None, espn_rate=None):
+        """Set the shared requests/second for stats.nba.com and ESPN"""
+        if nba_rate:
+            cls.nba_limiter.set_rate(nba_rate)
+        if espn_rate:
+            cls.espn_limiter.set_rate(espn_rate)
+
+    @classmethod
+    def configure_endpoints(cls, nba_base_url=None, espn_base_url=None):
+        """
+        Point stats.nba.com and ESPN requests at another host, e.g. the local
+        stand-in server ('http://127.0.0.1:8765'); applies process-wide
+        """
+        if nba_base_url:
+            from nba_api.stats.library.http import NBAStatsHTTP
+            NBAStatsHTTP.base_url = nba_base_url.rstrip('/') + "/stats/{endpoint}"
+        if espn_base_url:
+            cls.espn_base_url = espn_base_url.rstrip('/')
+
+    def __init__(self, cache=None, use_cache=True, metrics=None):
+        # Static player/team tables and their indexes, built on first lookup (see _static)
+        self._static_tables = None
+        self._static_lock = threading.Lock()
+
+        # Persistent response cache; cache hits skip the rate limiter
+        if cache is None and use_cache:
+            cache = ResponseCache()
+        self.cache = cache
+
+        # season -> {player_id: PlayerGameLog-shaped response}, see load_league_game_logs
+        self.league_game_logs = {}
+
+        # Opt-in instrumentation (instrumentation.Metrics); the default records nothing
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+
+        # ESPN injury reports: pooled session, short-lived snapshot, ETag revalidation
+        self.injury_client = InjuryClient(
+            self.espn_base_url,
+            cache=self.cache,
+            request=lambda team, fetch: self._request('espn_injuries', {'team': team}, fetch,
+                                                      limiter=self.espn_limiter)
+        )
+
+    def _static(self):
+        """
+        nba_api's bundled player/team tables plus the lookup indexes, built once
+        on first use so startup and cache-only runs skip them
+        """
+        if self._static_tables is None:
+            with self._static_lock:
+                if self._static_tables is None:
+                    from nba_api.stats.static import players, teams
+                    all_players = players.get_players()
+                    all_teams = teams.get_teams()
+                    self._static_tables = {
+                        'all_players': all_players,
+                        'all_teams': all_teams,
+                        'player_index': PlayerSearchIndex(all_players),
+                        'teams_by_id': {team['id']: team for team in all_teams},
+                        'teams_by_abbrev': {team['abbreviation']: team for team in all_teams},
+                    }
+        return self._static_tables
+
+    @property
+    def all_players(self):
+        return self._static()['all_players']
+
+    @property
+    def all_teams(self):
+        return self._static()['all_teams']
+
+    @property
+    def player_index(self):
+        return self._static()['player_index']
+
+    @property
+    def teams_by_id(self):
+        return self._static()['teams_by_id']
+
+    @property
+    def teams_by_abbrev(self):
+        return self._static()['teams_by_abbrev']
+
+    def _request(self, endpoint, params, fetch, limiter=None):
+        """
+        Return a cached response for (endpoint, params) or call fetch()
+        fetch: callable returning the response dict, or None on failure
+        limiter: RateLimiter to run fetch() under (default: nba_limiter)
+        """
+        metrics = self.metrics
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params)
+            if metrics.enabled:
+                metrics.record_cache(endpoint, cached is not None)
+            if cached is not None:
+                return cached
+
+        if metrics.enabled:
+            started = time.perf_counter()
+            try:
+                response = (limiter or self.nba_limiter).call(fetch)
+            except Exception as e:
+                metrics.record_error(endpoint, e)
+                raise
+            finally:
+                metrics.record_request(endpoint, time.perf_counter() - started)
+        else:
+            response = (limiter or self.nba_limiter).call(fetch)
+
+        if self.cache is not None and response is not None:
+            self.cache.set(endpoint, params, response)
+
+        return response
+
+    def _call_endpoint(self, endpoint_name, **kwargs):
+        """
+        Run an nba_api endpoint class (e.g. 'PlayerGameLog') and return its dict,
+        raising ThrottledError on 429. nba_api's endpoints (and pandas with them)
+        are imported here, on the first real request, not at startup
+        """
+        from nba_api.stats import endpoints
+        endpoint_cls = getattr(endpoints, endpoint_name)
+        endpoint = endpoint_cls(get_request=False, **kwargs)
+        try:
+            endpoint.get_request()
+        except (ValueError, KeyError):
+            # nba_api only sees an unparseable/unexpected body; the status code tells us why
+            if getattr(endpoint.nba_response, '_status_code', None) == 429:
+                raise ThrottledError(f"{endpoint_name} throttled (HTTP 429)")
+            raise
+        return endpoint.get_dict()
 
     def find_player_by_name(self, name):
-        """Find player by name (fuzzy matching)"""
-        name_lower = name.lower()
-        for player in self.all_players:
-            if name_lower in player['full_name'].lower():
-                return player
-        return None
+        """Find best-matching player by name (fuzzy matching)"""
+        candidates = self.player_index.search(name, limit=1)
+        return candidates[0] if candidates else None
+
+    def search_players(self, name, limit=5):
+        """Ranked candidate players for a name, best first"""
+        return self.player_index.search(name, limit=limit)
+
+    def find_player_by_id(self, player_id):
+        """Find player by ID"""
+        return self.player_index.get(player_id)
 
     def find_team_by_abbrev(self, abbrev):
         """Find team by abbreviation"""
-        for team in self.all_teams:
-            if team['abbreviation'] == abbrev:
-                return team
-        return None
+        return self.teams_by_abbrev.get(abbrev)
 
     def find_team_by_id(self, team_id):
         """Find team by ID"""
-        for team in self.all_teams:
-            if team['id'] == team_id:
-                return team
-        return None
+        return self.teams_by_id.get(team_id)
+
+    def get_player_game_log(self, player_id, season="2025-26", date_from=None):
+        """
+        Get last games for a player (from the league-wide index when loaded)
+        date_from: only games on/after this date ('MM/DD/YYYY'), always requested
+        """
+        if date_from is None and season in self.league_game_logs:
+            return self.league_game_logs[season].get(player_id) or self._empty_game_log()
+
+        params = {'player_id': player_id, 'season': season}
+        if date_from:
+            params['date_from'] = date_from
 
-    def get_player_game_log(self, player_id, season="2025-26"):
-        """Get last games for a player"""
         try:
-            game_log = playergamelog.PlayerGameLog(
-                player_id=player_id,
-                season=season,
-                season_type_all_star='Regular Season'
+            return self._request(
+                'playergamelog',
+                params,
+                lambda: self._call_endpoint(
+                    'PlayerGameLog',
+                    player_id=player_id,
+                    season=season,
+                    season_type_all_star='Regular Season',
+                    date_from_nullable=date_from or ''
+                )
             )
-            time.sleep(0.6)
-            return game_log.get_dict()
         except Exception as e:
             print(f"    Error: {e}")
             return None
 
+    def get_league_game_logs(self, season="2025-26", date_from=None):
+        """
+        Get every player's game log for the season in one request
+        date_from: only games on/after this date ('MM/DD/YYYY')
+        """
+        params = {'season': season}
+        if date_from:
+            params['date_from'] = date_from
+
+        try:
+            return self._request(
+                'playergamelogs',
+                params,
+                lambda: self._call_endpoint(
+                    'PlayerGameLogs',
+                    season_nullable=season,
+                    season_type_nullable='Regular Season',
+                    date_from_nullable=date_from or ''
+                )
+            )
+        except Exception as e:
+            print(f"    Error getting league game logs: {e}")
+            return None
+
+    def load_league_game_logs(self, season="2025-26"):
+        """
+        Fetch the league-wide game log once and index it by player_id
+        Afterwards get_player_game_log answers from memory for that season
+        Returns: True if the index was built
+        """
+        response = self.get_league_game_logs(season)
+        if not response:
+            return False
+
+        try:
+            self.league_game_logs[season] = self._index_league_game_logs(response)
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"    Error indexing league game logs: {e}")
+            return False
+
+        return True
+
+    def _index_league_game_logs(self, response_dict):
+        """
+        Split a PlayerGameLogs response into per-player PlayerGameLog-shaped
+        responses (newest game first, 'Oct 22, 2025' dates) for the parser
+        """
+        result_set = response_dict['resultSets'][0]
+        headers = result_set['headers']
+        player_id_idx = headers.index('PLAYER_ID')
+        game_date_idx = headers.index('GAME_DATE')
+
+        rows_by_player = {}
+        for row in result_set['rowSet']:
+            row = list(row)
+            # League logs use ISO timestamps ('2025-10-22T00:00:00')
+            row[game_date_idx] = datetime.strptime(row[game_date_idx][:10], '%Y-%m-%d')
+            rows_by_player.setdefault(row[player_id_idx], []).append(row)
+
+        index = {}
+        for player_id, rows in rows_by_player.items():
+            rows.sort(key=lambda r: r[game_date_idx], reverse=True)
+            for row in rows:
+                row[game_date_idx] = row[game_date_idx].strftime('%b %d, %Y')
+            index[player_id] = {
+                'resultSets': [{'name': 'PlayerGameLog', 'headers': headers, 'rowSet': rows}]
+            }
+
+        return index
+
+    def _empty_game_log(self):
+        """PlayerGameLog-shaped response with no games"""
+        return {'resultSets': [{'name': 'PlayerGameLog', 'headers': ['GAME_DATE', 'FG3M', 'FG3A'], 'rowSet': []}]}
+
     def get_player_info(self, player_id):
         """Get player position and basic info"""
         try:
-            player_info = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
-            time.sleep(0.6)
-            return player_info.get_dict()
+            return self._request(
+                'commonplayerinfo',
+                {'player_id': player_id},
+                lambda: self._call_endpoint('CommonPlayerInfo', player_id=player_id)
+            )
         except Exception as e:
             print(f"    Error: {e}")
             return None
 
+    def get_player_index(self, season="2025-26"):
+        """Get every player's team and position in one request"""
+        try:
+            return self._request(
+                'playerindex',
+                {'season': season},
+                lambda: self._call_endpoint('PlayerIndex', season=season)
+            )
+        except Exception as e:
+            print(f"    Error getting player index: {e}")
+            return None
+
+    def get_league_player_stats(self, season="2025-26"):
+        """Get every player's season totals (GP, FG3M, FG3A, ...) in one request"""
+        try:
+            return self._request(
+                'leaguedashplayerstats',
+                {'season': season},
+                lambda: self._call_endpoint(
+                    'LeagueDashPlayerStats',
+                    season=season,
+                    per_mode_detailed='Totals',
+                    season_type_all_star='Regular Season'
+                )
+            )
+        except Exception as e:
+            print(f"    Error getting league player stats: {e}")
+            return None
+
     def get_team_defense_stats(self, team_id, season="2025-26"):
         """Get opponent's overall 3P defense"""
         try:
-            team_dashboard = teamdashboardbygeneralsplits.TeamDashboardByGeneralSplits(
-                team_id=team_id,
-                season=season,
-                season_type_all_star='Regular Season',
-                measure_type_detailed_defense='Opponent'
+            return self._request(
+                'teamdashboardbygeneralsplits',
+                {'team_id': team_id, 'season': season, 'measure_type': 'Opponent'},
+                lambda: self._call_endpoint(
+                    'TeamDashboardByGeneralSplits',
+                    team_id=team_id,
+                    season=season,
+                    season_type_all_star='Regular Season',
+                    measure_type_detailed_defense='Opponent'
+                )
             )
-            time.sleep(0.6)
-            return team_dashboard.get_dict()
         except Exception as e:
             print(f"    Error: {e}")
             return None
@@ -77,14 +337,17 @@ class NBADataFetcher:
         This returns how each team defends different positions
         """
         try:
-            defense_data = leaguedashptdefend.LeagueDashPtDefend(
-                season=season,
-                season_type_all_star='Regular Season',
-                per_mode_simple='PerGame',
-                defense_category='3 Pointers'  # Specifically 3-point defense
+            return self._request(
+                'leaguedashptdefend',
+                {'season': season, 'defense_category': '3 Pointers'},
+                lambda: self._call_endpoint(
+                    'LeagueDashPtDefend',
+                    season=season,
+                    season_type_all_star='Regular Season',
+                    per_mode_simple='PerGame',
+                    defense_category='3 Pointers'  # Specifically 3-point defense
+                )
             )
-            time.sleep(0.6)
-            return defense_data.get_dict()
         except Exception as e:
             print(f"    Error getting position defense: {e}")
             return None
@@ -92,43 +355,89 @@ class NBADataFetcher:
     def get_team_roster(self, team_id, season="2025-26"):
         """Get team's current roster"""
         try:
-            roster = commonteamroster.CommonTeamRoster(
-                team_id=team_id,
-                season=season
+            return self._request(
+                'commonteamroster',
+                {'team_id': team_id, 'season': season},
+                lambda: self._call_endpoint(
+                    'CommonTeamRoster',
+                    team_id=team_id,
+                    season=season
+                )
             )
-            time.sleep(0.6)
-            return roster.get_dict()
         except Exception as e:
             print(f"    Error getting roster: {e}")
             return None
 
+    def get_team_game_log(self, team_id, season="2025-26"):
+        """Get a team's games for the season (newest first)"""
+        try:
+            return self._request(
+                'teamgamelog',
+                {'team_id': team_id, 'season': season},
+                lambda: self._call_endpoint(
+                    'TeamGameLog',
+                    team_id=team_id,
+                    season=season,
+                    season_type_all_star='Regular Season'
+                )
+            )
+        except Exception as e:
+            print(f"    Error getting team game log: {e}")
+            return None
+
+    def get_league_team_game_log(self, season="2025-26"):
+        """Get every team-game of the season (one row per team per game) in one request"""
+        try:
+            return self._request(
+                'leaguegamelog',
+                {'season': season, 'player_or_team': 'T'},
+                lambda: self._call_endpoint(
+                    'LeagueGameLog',
+                    season=season,
+                    season_type_all_star='Regular Season',
+                    player_or_team_abbreviation='T'
+                )
+            )
+        except Exception as e:
+            print(f"    Error getting league game log: {e}")
+            return None
+
+    def get_box_score(self, game_id):
+        """Get the traditional box score for a game (both teams)"""
+        try:
+            return self._request(
+                'boxscoretraditionalv2',
+                {'game_id': game_id},
+                lambda: self._call_endpoint('BoxScoreTraditionalV2', game_id=game_id)
+            )
+        except Exception as e:
+            print(f"    Error getting box score: {e}")
+            return None
+
     def get_todays_games(self, days_ahead=0):
         """
         Get games for today or future date
         days_ahead: 0 for today, 1 for tomorrow, etc.
         """
-        try:
-            target_date = datetime.now() + timedelta(days=days_ahead)
-            game_date = target_date.strftime('%Y-%m-%d')
+        target_date = datetime.now() + timedelta(days=days_ahead)
+        return self.get_games_for_date(target_date.strftime('%Y-%m-%d'))
 
-            scoreboard = scoreboardv2.ScoreboardV2(game_date=game_date)
-            time.sleep(0.6)
-            return scoreboard.get_dict()
+    def get_games_for_date(self, game_date):
+        """Get the scoreboard for a date ('YYYY-MM-DD')"""
+        try:
+            return self._request(
+                'scoreboardv2',
+                {'game_date': game_date},
+                lambda: self._call_endpoint('ScoreboardV2', game_date=game_date)
+            )
         except Exception as e:
             print(f"    Error getting games: {e}")
             return None
 
     def get_team_injuries(self, team_abbrev):
-        """Get ESPN injury report for a team"""
-        import requests
-        team_abbrev_lower = team_abbrev.lower()
-        url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/nba/teams/{team_abbrev_lower}/injuries"
+        """Get ESPN injury report for a team (see InjuryClient)"""
+        return self.injury_client.get(team_abbrev)
 
-        try:
-            response = requests.get(url, timeout=5)
-            if response.status_code != 200:
-                return {'injuries': []}
-            return response.json()
-        except Exception as e:
-            print(f"    Error fetching injuries: {e}")
-            return {'injuries': []}
\ No newline at end of file
+    def prefetch_injuries(self, team_abbrevs, workers=8):
+        """Fetch several teams' injury reports concurrently, one request per team"""
+        return self.injury_client.get_many(team_abbrevs, workers=workers)
\ No newline at end of file
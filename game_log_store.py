@@ -0,0 +1,273 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from response_cache import DEFAULT_CACHE_DIR, seconds_until_rollover
+
+DEFAULT_STORE_PATH = os.path.join(DEFAULT_CACHE_DIR, 'game_logs.sqlite')
+
+
+class PlayerRollingStats:
+    """
+    Running last-10-game windows and season totals for one player
+    Adding a game is O(1); to_player_stats() matches NBADataParser.parse_player_game_log
+    """
+
+    def __init__(self):
+        self.last_10_3pm = deque(maxlen=10)
+        self.last_10_3pa = deque(maxlen=10)
+        self.last_10_dates = deque(maxlen=10)
+        self.games_played = 0
+        self.total_3pa = 0
+        self.last_date = None
+
+    def add_game(self, game_date, fg3m, fg3a):
+        """Add a game (must be newer than every game already added)"""
+        fg3m = fg3m or 0
+        fg3a = fg3a or 0
+        self.last_10_3pm.append(fg3m)
+        self.last_10_3pa.append(fg3a)
+        self.last_10_dates.append(game_date)
+        self.games_played += 1
+        self.total_3pa += fg3a
+        self.last_date = game_date
+
+    def to_player_stats(self, use_season_avg=True):
+        """Same dict as parse_player_game_log, or None with fewer than 5 games"""
+        import numpy as np
+        if self.games_played < 5:
+            return None
+
+        last_10_3pm = list(reversed(self.last_10_3pm))
+        last_10_3pa = list(reversed(self.last_10_3pa))
+        last_10_dates = [
+            datetime.strptime(d, '%Y-%m-%d').strftime('%-m/%-d/%Y') for d in reversed(self.last_10_dates)
+        ]
+
+        # Integer totals, so these equal the parser's np.mean results exactly
+        season_avg = np.float64(self.total_3pa / self.games_played)
+        last_10_avg = np.float64(sum(last_10_3pa) / len(last_10_3pa))
+
+        return {
+            'last_5_3pm': last_10_3pm[:5],
+            'last_10_3pm': last_10_3pm,
+            'last_5_dates': last_10_dates[:5],
+            'last_10_dates': last_10_dates,
+            'last_10_3pa': last_10_3pa,
+            '3pa_per_game': round(season_avg if use_season_avg else last_10_avg, 1),
+            'season_3pa_avg': round(season_avg, 1),
+            'last_10_3pa_avg': round(last_10_avg, 1),
+            'games_played': self.games_played
+        }
+
+
+def _normalize_game_date(date_str):
+    """'2025-10-22T00:00:00' or 'OCT 22, 2025' -> '2025-10-22'"""
+    if 'T' in date_str or date_str[:4].isdigit():
+        return date_str[:10]
+    return datetime.strptime(date_str, '%b %d, %Y').strftime('%Y-%m-%d')
+
+
+class GameLogStore:
+    """
+    Persistent per-player game logs with incremental syncing
+    Only games after the last stored date are requested (per player, or since
+    the last league sync in one call), and rolling stats update in O(1) per game
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, season="2025-26"):
+        self.path = path
+        self.season = season
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS player_games ('
+                'player_id INTEGER NOT NULL, '
+                'season TEXT NOT NULL, '
+                'game_id TEXT NOT NULL, '
+                'game_date TEXT NOT NULL, '
+                'fg3m INTEGER, '
+                'fg3a INTEGER, '
+                'minutes REAL, '
+                'PRIMARY KEY (player_id, season, game_id))'
+            )
+            # Written only by sync_league: sync_player stores single players' full
+            # logs, so MAX(game_date) over player_games is not a league watermark
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS sync_state ('
+                'season TEXT PRIMARY KEY, '
+                'league_last_date TEXT)'
+            )
+            self._conn.commit()
+
+        self._rolling = {}  # player_id -> PlayerRollingStats, loaded lazily
+        self._player_valid_until = {}
+        self._league_valid_until = 0.0
+
+    def _load_player(self, player_id):
+        """Rolling stats for a player, replaying stored games once per process"""
+        rolling = self._rolling.get(player_id)
+        if rolling is None:
+            rolling = PlayerRollingStats()
+            rows = self._conn.execute(
+                'SELECT game_date, fg3m, fg3a FROM player_games WHERE player_id = ? AND season = ? '
+                'ORDER BY game_date, game_id',
+                (player_id, self.season)
+            ).fetchall()
+            for game_date, fg3m, fg3a in rows:
+                rolling.add_game(game_date, fg3m, fg3a)
+            self._rolling[player_id] = rolling
+        return rolling
+
+    def _last_stored_date(self, player_id):
+        row = self._conn.execute(
+            'SELECT MAX(game_date) FROM player_games WHERE player_id = ? AND season = ?',
+            (player_id, self.season)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _league_last_date(self):
+        """Last game date covered by a league sync, or None before the first one"""
+        row = self._conn.execute(
+            'SELECT league_last_date FROM sync_state WHERE season = ?', (self.season,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_league_last_date(self, last_date):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO sync_state (season, league_last_date) VALUES (?, ?)',
+            (self.season, last_date)
+        )
+        self._conn.commit()
+
+    def _ingest(self, response_dict, player_id=None):
+        """
+        Insert new games from a PlayerGameLog(s) response and push them into
+        the rolling stats; returns (new games, newest game date in the response)
+        """
+        result_set = response_dict['resultSets'][0]
+        headers = result_set['headers']
+        game_id_idx = headers.index('Game_ID') if 'Game_ID' in headers else headers.index('GAME_ID')
+        player_id_idx = headers.index('PLAYER_ID') if 'PLAYER_ID' in headers else None
+        date_idx = headers.index('GAME_DATE')
+        fg3m_idx = headers.index('FG3M')
+        fg3a_idx = headers.index('FG3A')
+        min_idx = headers.index('MIN') if 'MIN' in headers else None
+
+        games = []
+        for row in result_set['rowSet']:
+            games.append((
+                row[player_id_idx] if player_id_idx is not None else player_id,
+                str(row[game_id_idx]),
+                _normalize_game_date(row[date_idx]),
+                row[fg3m_idx],
+                row[fg3a_idx],
+                row[min_idx] if min_idx is not None else None,
+            ))
+        # Oldest first so each player's rolling windows advance in order
+        games.sort(key=lambda g: (g[2], g[1]))
+
+        added = 0
+        with self._lock:
+            for game_player_id, game_id, game_date, fg3m, fg3a, minutes in games:
+                cursor = self._conn.execute(
+                    'INSERT OR IGNORE INTO player_games '
+                    '(player_id, season, game_id, game_date, fg3m, fg3a, minutes) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (game_player_id, self.season, game_id, game_date, fg3m, fg3a, minutes)
+                )
+                if cursor.rowcount == 0:
+                    continue  # already stored (the date_from day overlaps)
+                added += 1
+
+                rolling = self._rolling.get(game_player_id)
+                if rolling is not None:
+                    rolling.add_game(game_date, fg3m, fg3a)
+            self._conn.commit()
+
+        return added, (games[-1][2] if games else None)
+
+    @staticmethod
+    def _date_from(last_date):
+        """Stored 'YYYY-MM-DD' -> nba_api DateFrom ('MM/DD/YYYY'), inclusive"""
+        return datetime.strptime(last_date, '%Y-%m-%d').strftime('%m/%d/%Y') if last_date else None
+
+    def sync_player(self, fetcher, player_id, force=False):
+        """Fetch only this player's games since the last stored date"""
+        with self._lock:
+            now = time.time()
+            if not force and max(self._league_valid_until, self._player_valid_until.get(player_id, 0)) > now:
+                return 0
+            self._load_player(player_id)
+            date_from = self._date_from(self._last_stored_date(player_id))
+
+        response = fetcher.get_player_game_log(player_id, self.season, date_from=date_from)
+        if not response:
+            return 0
+
+        try:
+            added, _ = self._ingest(response, player_id)
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"    Error storing game log: {e}")
+            return 0
+
+        with self._lock:
+            self._player_valid_until[player_id] = time.time() + seconds_until_rollover()
+        return added
+
+    def sync_league(self, fetcher, force=False):
+        """
+        Fetch every player's games since the last league sync in one request
+        (the whole season on the first sync)
+        """
+        with self._lock:
+            if not force and self._league_valid_until > time.time():
+                return 0
+            previous_last_date = self._league_last_date()
+            date_from = self._date_from(previous_last_date)
+
+        response = fetcher.get_league_game_logs(self.season, date_from=date_from)
+        if not response:
+            return 0
+
+        try:
+            added, last_date = self._ingest(response)
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"    Error storing league game logs: {e}")
+            return 0
+
+        with self._lock:
+            if last_date and (previous_last_date is None or last_date > previous_last_date):
+                self._set_league_last_date(last_date)
+            self._league_valid_until = time.time() + seconds_until_rollover()
+        return added
+
+    def player_ids(self):
+        """Every player with stored games this season"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT DISTINCT player_id FROM player_games WHERE season = ?', (self.season,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def all_games(self):
+        """[(player_id, game_date, fg3m, fg3a, minutes)] for the season, oldest first per player"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT player_id, game_date, fg3m, fg3a, minutes FROM player_games WHERE season = ? '
+                'ORDER BY player_id, game_date, game_id',
+                (self.season,)
+            ).fetchall()
+
+    def get_player_stats(self, player_id, use_season_avg=True):
+        """parse_player_game_log-equivalent stats from the rolling windows"""
+        with self._lock:
+            return self._load_player(player_id).to_player_stats(use_season_avg)
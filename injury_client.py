@@ -0,0 +1,152 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rate_limiter import ThrottledError
+from ttl_cache import TTLCache
+
+INJURIES_PATH = "/apis/site/v2/sports/basketball/nba/teams/{team}/injuries"
+
+
+class InjuryClient:
+    """
+    ESPN injury reports over one pooled requests.Session
+    Reports are kept in a short-TTL in-memory snapshot. Once a report expires
+    it is revalidated with If-None-Match / If-Modified-Since using validators
+    persisted in the response cache, so an unchanged report costs a bodyless
+    304. Concurrent callers asking for the same team share one request
+    """
+
+    def __init__(self, base_url="https://site.api.espn.com", cache=None, request=None, snapshot_ttl=120,
+                 timeout=5, pool_size=16):
+        """
+        cache: ResponseCache holding validators across runs (None keeps them in memory)
+        request: callable(team, fetch) wrapping each network fetch, e.g. the
+                 fetcher's rate-limited _request; defaults to calling fetch()
+        """
+        self.base_url = base_url.rstrip('/')
+        self.cache = cache
+        self.request = request or (lambda team, fetch: fetch())
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.snapshot = TTLCache(64, ttl=snapshot_ttl, name='injury_snapshot')
+
+        self._session = None
+        self._lock = threading.Lock()
+        self._team_locks = {}
+        self._validators = {}  # team -> (validators, report) when there is no cache
+
+        # Counters
+        self.requests = 0
+        self.not_modified = 0
+
+    @property
+    def session(self):
+        """
+        One keep-alive connection pool for every team and thread, created (and
+        requests imported) on the first fetch rather than at startup
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def _team_lock(self, team):
+        with self._lock:
+            return self._team_locks.setdefault(team, threading.Lock())
+
+    def _stored(self, team):
+        """(validators, report) from the last 200 response for a team, or (None, None)"""
+        if self.cache is not None:
+            return self.cache.get_validated('espn_injuries', {'team': team})
+        return self._validators.get(team, (None, None))
+
+    def _store(self, team, validators, report):
+        if self.cache is not None:
+            self.cache.set_validated('espn_injuries', {'team': team}, validators, report)
+        else:
+            self._validators[team] = (validators, report)
+
+    def _fetch(self, team):
+        """Conditional GET of one team's report; None on a non-200/304 answer"""
+        validators, stored = self._stored(team)
+        headers = {}
+        if stored is not None:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        response = self.session.get(self.base_url + INJURIES_PATH.format(team=team), headers=headers,
+                                    timeout=self.timeout)
+        with self._lock:
+            self.requests += 1
+
+        if response.status_code == 304 and stored is not None:
+            with self._lock:
+                self.not_modified += 1
+            return stored
+        if response.status_code == 429:
+            raise ThrottledError("ESPN injuries throttled (HTTP 429)")
+        if response.status_code != 200:
+            return None
+
+        report = response.json()
+        validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        if any(validators.values()):
+            self._store(team, validators, report)
+        return report
+
+    def get(self, team_abbrev):
+        """A team's injury report ({'injuries': [...]}), empty if it could not be fetched"""
+        team = team_abbrev.lower()
+        report = self.snapshot.get(team)
+        if report is not None:
+            return report
+
+        with self._team_lock(team):
+            # Another thread may have fetched it while we waited
+            report = self.snapshot.get(team)
+            if report is not None:
+                return report
+
+            try:
+                report = self.request(team, lambda: self._fetch(team))
+            except Exception as e:
+                print(f"    Error fetching injuries: {e}")
+                report = None
+
+            if report is None:
+                return {'injuries': []}  # not snapshotted, so the next call retries
+            self.snapshot.set(team, report)
+            return report
+
+    def get_many(self, team_abbrevs, workers=8):
+        """{team_abbrev: report} for several teams, fetched concurrently, one request per team"""
+        team_abbrevs = list(dict.fromkeys(team_abbrevs))
+        if workers <= 1 or len(team_abbrevs) <= 1:
+            return {team: self.get(team) for team in team_abbrevs}
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(team_abbrevs))) as executor:
+            return dict(zip(team_abbrevs, executor.map(self.get, team_abbrevs)))
+
+    def invalidate(self, team_abbrev=None):
+        """Drop one team's snapshot (or all), forcing a revalidation on the next get"""
+        if team_abbrev is None:
+            self.snapshot.clear()
+        else:
+            self.snapshot.invalidate(team_abbrev.lower())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'snapshot': self.snapshot.stats()
+            }
@@ -0,0 +1,219 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+# Upper bounds in seconds, Prometheus-style (cumulative, plus +Inf)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Errors kept verbatim per source; older ones are only counted
+MAX_ERROR_MESSAGES = 20
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, sum and count"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)] including '+Inf'"""
+        total = 0
+        result = []
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'buckets': {str(bound): count for bound, count in self.cumulative()}
+        }
+
+
+class Metrics:
+    """
+    Opt-in run metrics: stage timings, requests and latency per endpoint,
+    cache hits/misses and errors; export with to_json() or to_prometheus()
+    Use NULL_METRICS (enabled=False) when instrumentation is off
+    """
+
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.started_at = time.time()
+
+        self._lock = threading.Lock()
+        self.stages = {}  # stage -> Histogram
+        self.requests = {}  # endpoint -> Histogram (network calls only)
+        self.cache_hits = {}
+        self.cache_misses = {}
+        self.errors = {}  # (source, exception type) -> count
+        self.error_messages = []
+
+    def stage(self, name):
+        """Context manager timing one stage (a no-op when disabled)"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed_stage(name)
+
+    @contextmanager
+    def _timed_stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._observe(self.stages, name, time.perf_counter() - started)
+
+    def _observe(self, histograms, key, seconds):
+        with self._lock:
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def record_request(self, endpoint, seconds):
+        """One network request (including rate-limiter waits and retries)"""
+        if self.enabled:
+            self._observe(self.requests, endpoint, seconds)
+
+    def record_cache(self, endpoint, hit):
+        if not self.enabled:
+            return
+        with self._lock:
+            counter = self.cache_hits if hit else self.cache_misses
+            counter[endpoint] = counter.get(endpoint, 0) + 1
+
+    def record_error(self, source, exc):
+        """Count an error by source and exception type, keeping the first messages"""
+        if not self.enabled:
+            return
+        key = (source, type(exc).__name__)
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+            if len(self.error_messages) < MAX_ERROR_MESSAGES:
+                self.error_messages.append({'source': source, 'type': key[1], 'message': str(exc)})
+
+    def summary(self, extra=None):
+        """JSON-serializable snapshot; extra is merged in (e.g. rate limiter stats)"""
+        with self._lock:
+            endpoints = sorted(set(self.requests) | set(self.cache_hits) | set(self.cache_misses))
+            result = {
+                'elapsed_seconds': round(time.time() - self.started_at, 3),
+                'stages': {name: histogram.to_dict() for name, histogram in sorted(self.stages.items())},
+                'endpoints': {
+                    endpoint: {
+                        'requests': self.requests[endpoint].count if endpoint in self.requests else 0,
+                        'cache_hits': self.cache_hits.get(endpoint, 0),
+                        'cache_misses': self.cache_misses.get(endpoint, 0),
+                        'latency': self.requests[endpoint].to_dict() if endpoint in self.requests else None
+                    }
+                    for endpoint in endpoints
+                },
+                'errors': [
+                    {'source': source, 'type': error_type, 'count': count}
+                    for (source, error_type), count in sorted(self.errors.items())
+                ],
+                'error_messages': list(self.error_messages)
+            }
+        if extra:
+            result.update(extra)
+        return result
+
+    def to_json(self, extra=None):
+        return json.dumps(self.summary(extra), indent=2)
+
+    def to_prometheus(self, prefix='threept', extra=None):
+        """
+        Prometheus text exposition format
+        extra: numbers become gauges, lists of dicts with a 'name' become one
+        gauge per numeric field labelled by name (e.g. rate limiter stats);
+        anything else is JSON-only
+        """
+        lines = []
+        with self._lock:
+            _histogram_lines(lines, f'{prefix}_stage_seconds', 'Time spent per analysis stage', 'stage',
+                             self.stages)
+            _histogram_lines(lines, f'{prefix}_request_seconds', 'Network request latency per endpoint',
+                             'endpoint', self.requests)
+            _counter_lines(lines, f'{prefix}_cache_hits_total', 'Response cache hits', 'endpoint',
+                           self.cache_hits)
+            _counter_lines(lines, f'{prefix}_cache_misses_total', 'Response cache misses', 'endpoint',
+                           self.cache_misses)
+
+            lines.append(f'# HELP {prefix}_errors_total Errors by source and exception type')
+            lines.append(f'# TYPE {prefix}_errors_total counter')
+            for (source, error_type), count in sorted(self.errors.items()):
+                lines.append(f'{prefix}_errors_total{{source="{source}",type="{error_type}"}} {count}')
+
+        for key, value in sorted((extra or {}).items()):
+            _extra_lines(lines, f'{prefix}_{key}', value)
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path, extra=None):
+        """Write to_prometheus() for *.prom/*.txt paths, to_json() otherwise"""
+        with open(path, 'w') as f:
+            if path.endswith(('.prom', '.txt')):
+                f.write(self.to_prometheus(extra=extra))
+            else:
+                f.write(self.to_json(extra))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _extra_lines(lines, name, value):
+    if _is_number(value):
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+        return
+    if not isinstance(value, list):
+        return
+
+    items = [item for item in value if isinstance(item, dict) and 'name' in item]
+    fields = sorted({field for item in items for field, v in item.items() if _is_number(v)})
+    for field in fields:
+        lines.append(f'# TYPE {name}_{field} gauge')
+        for item in items:
+            if _is_number(item.get(field)):
+                lines.append(f'{name}_{field}{{name="{item["name"]}"}} {item[field]}')
+
+
+def _histogram_lines(lines, name, help_text, label, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for key, histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{bound}"}} {count}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {histogram.count}')
+
+
+def _counter_lines(lines, name, help_text, label, counters):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} counter')
+    for key, count in sorted(counters.items()):
+        lines.append(f'{name}{{{label}="{key}"}} {count}')
+
+
+_NULL_STAGE = nullcontext()
+
+# Shared disabled instance: every method returns immediately
+NULL_METRICS = Metrics(enabled=False)
@@ -1,18 +1,52 @@
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 from data_fetcher import NBADataFetcher
-from predictor import ThreePointPredictor
+from game_log_store import DEFAULT_STORE_PATH, GameLogStore
+from instrumentation import Metrics
+from matchup_matrix import MatchupMatrix
+from predictor import ThreePointPredictor, load_confidence_params
 from parser import NBADataParser
+from position_defense_table import DEFAULT_TABLE_PATH, PositionDefenseTable
+from position_index import DEFAULT_INDEX_PATH, PlayerPositionIndex
+from response_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_PATH, ResponseCache, cache_dir_for
+from shooter_filter import ShooterFilter
 from simple_position_defense import SimplePositionDefense
+from top_k import TopK
+
+
+def analyze_player(fetcher, parser, predictor, pos_def, player_id, player_name, opponent_id, opponent_abbrev,
+                   position_index=None, matrix=None, game_log_store=None, defense_table=None, injury_index=None,
+                   season_matrix=None):
+    """
+    Analyze a single player and return prediction data
+    position_index: optional PlayerPositionIndex used instead of a player info request
+    matrix: optional built MatchupMatrix; known matchups are read from it without any request
+    game_log_store: optional GameLogStore; syncs only new games and reads its rolling stats
+    defense_table: optional PositionDefenseTable; measured position splits instead of estimates
+    injury_index: optional {team_abbrev: injury_impact} from prepare_slate; skips the injury lookup
+    season_matrix: optional SeasonStatsMatrix; player stats are sliced from it without any request
+    """
+    metrics = fetcher.metrics
+    if matrix is not None and matrix.has_matchup(player_id, opponent_id):
+        with metrics.stage('matrix_lookup'):
+            return matrix.result(predictor, player_id, player_name, opponent_id)
 
-
-def analyze_player(fetcher, parser, predictor, pos_def, player_id, player_name, opponent_id, opponent_abbrev):
-    """Analyze a single player and return prediction data"""
     try:
         # Get player stats
-        game_log_response = fetcher.get_player_game_log(player_id)
-        if not game_log_response:
-            return None
+        with metrics.stage('game_log'):
+            if season_matrix is not None:
+                player_stats = season_matrix.player_stats(player_id)
+            elif game_log_store is not None:
+                game_log_store.sync_player(fetcher, player_id)
+                player_stats = game_log_store.get_player_stats(player_id)
+            else:
+                game_log_response = fetcher.get_player_game_log(player_id)
+                if not game_log_response:
+                    return None
 
-        player_stats = parser.parse_player_game_log(game_log_response)
+                player_stats = parser.parse_player_game_log(game_log_response)
         if not player_stats:
             return None
 
@@ -21,31 +55,45 @@ def analyze_player(fetcher, parser, predictor, pos_def, player_id, player_name,
             return None
 
         # Get player position
-        player_info_response = fetcher.get_player_info(player_id)
-        position = parser.parse_player_info(player_info_response) if player_info_response else 'SG'
+        with metrics.stage('player_info'):
+            if position_index is not None:
+                position = position_index.get_position(fetcher, parser, player_id)
+            else:
+                player_info_response = fetcher.get_player_info(player_id)
+                position = parser.parse_player_info(player_info_response) if player_info_response else 'SG'
 
-        # Get opponent defense - fast and reliable
-        defense_response = fetcher.get_team_defense_stats(opponent_id)
-        overall_defense = parser.parse_team_defense_stats(defense_response) if defense_response else 0.365
+        with metrics.stage('team_defense'):
+            if defense_table is not None and defense_table.has_team(opponent_id):
+                # Measured position splits from the persisted table, no request
+                opponent_stats = defense_table.get_position_defense_stats(opponent_id)
+            else:
+                # Get opponent defense - fast and reliable
+                defense_response = fetcher.get_team_defense_stats(opponent_id)
+                overall_defense = parser.parse_team_defense_stats(defense_response) if defense_response else 0.365
 
-        # Estimate position-specific defense from overall
-        opponent_stats = pos_def.get_position_defense_stats(overall_defense)
+                # Estimate position-specific defense from overall
+                opponent_stats = pos_def.get_position_defense_stats(overall_defense)
 
         # Get injuries
-        injury_response = fetcher.get_team_injuries(opponent_abbrev)
-        injuries = parser.parse_injuries(injury_response)
+        with metrics.stage('injuries'):
+            impact = injury_index.get(opponent_abbrev) if injury_index is not None else None
+            if impact is None:
+                injury_response = fetcher.get_team_injuries(opponent_abbrev)
+                impact = predictor.injury_impact(parser.parse_injuries(injury_response), opponent_abbrev)
 
         # Calculate prediction
-        prediction = predictor.calculate_prediction(player_stats, opponent_stats, position)
-        adjusted_prediction, injured_defenders = predictor.adjust_for_injuries(
-            prediction, injuries, opponent_abbrev
-        )
+        with metrics.stage('predict'):
+            prediction = predictor.calculate_prediction(player_stats, opponent_stats, position)
+            adjusted_prediction, injured_defenders = predictor.adjust_for_injuries(
+                prediction, None, opponent_abbrev, impact=impact
+            )
 
-        confidence_score, flags = predictor.calculate_confidence(
-            player_stats, opponent_stats, position, injuries, opponent_abbrev
-        )
+        with metrics.stage('confidence'):
+            confidence_score, flags = predictor.calculate_confidence(
+                player_stats, opponent_stats, position, None, opponent_abbrev, impact=impact
+            )
 
-        confidence_tier = predictor.get_confidence_tier(confidence_score)
+            confidence_tier = predictor.get_confidence_tier(confidence_score)
 
         return {
             'name': player_name,
@@ -60,17 +108,297 @@ def analyze_player(fetcher, parser, predictor, pos_def, player_id, player_name,
             'opponent_defense': opponent_stats
         }
     except Exception as e:
+        metrics.record_error('analyze_player', e)
         print(f"      Error analyzing {player_name}: {e}")
         return None
 
 
-def main():
+def select_players(player_ids, shooter_filter=None):
+    """Roster players to analyze: the filter's shooters, or the first 10"""
+    if shooter_filter is not None:
+        return shooter_filter.select(player_ids)
+    return player_ids[:10]
+
+
+def prepare_slate(fetcher, parser, predictor, pos_def, workers=1, bulk_game_logs=True,
+                  position_index=None, matrix=None, game_log_store=None, defense_table=None, games=None,
+                  shooter_filter=None):
+    """
+    Load the league-wide data a slate scan reads from (see scan_slate for the options)
+    games: the slate; every team's injury report is fetched up front, concurrently
+    Returns: injury index ({team_abbrev: injury_impact}) for the slate's teams
+    """
+    if game_log_store is not None:
+        game_log_store.sync_league(fetcher)
+    elif bulk_game_logs:
+        fetcher.load_league_game_logs()
+    if position_index is not None:
+        position_index.ensure_built(fetcher, parser)
+    if shooter_filter is not None:
+        shooter_filter.ensure_built(fetcher, parser)
+    if defense_table is not None:
+        defense_table.update(fetcher, parser, position_index, workers=workers)
+    if matrix is not None:
+        matrix.ensure_built(fetcher, parser, predictor, pos_def, position_index, workers=workers,
+                            game_log_store=game_log_store, defense_table=defense_table)
+    if games:
+        team_abbrevs = []
+        for game in games:
+            for team_id in (game['home_team_id'], game['visitor_team_id']):
+                team = fetcher.find_team_by_id(team_id)
+                if team:
+                    team_abbrevs.append(team['abbreviation'])
+        reports = fetcher.prefetch_injuries(team_abbrevs, workers=max(workers, 8))
+        return predictor.build_injury_index(
+            {team: parser.parse_injuries(report) for team, report in reports.items()}
+        )
+    return {}
+
+
+def scan_slate(fetcher, parser, predictor, pos_def, games, workers=1, bulk_game_logs=True,
+               position_index=None, matrix=None, game_log_store=None, defense_table=None, shooter_filter=None,
+               season_matrix=None):
+    """
+    Analyze each team's 3PT shooters (or first 10 roster players) for every game on a slate
+    workers: thread pool size, 1 runs everything sequentially
+    bulk_game_logs: load the league-wide game log once instead of one
+                    request per player (falls back to per-player on failure)
+    position_index: optional PlayerPositionIndex shared by all player analyses
+    matrix: optional MatchupMatrix, (re)built if stale and read for every known matchup
+    game_log_store: optional GameLogStore, synced once for the whole league (new games only)
+    defense_table: optional PositionDefenseTable, updated with unprocessed games first
+    shooter_filter: optional ShooterFilter; only roster players passing the 3PA
+                    filter are analyzed, instead of the first 10
+    season_matrix: optional memory-mapped SeasonStatsMatrix read for every player's
+                   stats (pass bulk_game_logs=False, it replaces the league game log)
+    Returns: list of matchups in slate order, each with per-team results
+             in roster order (identical for any worker count)
+    """
+    injury_index = prepare_slate(fetcher, parser, predictor, pos_def, workers, bulk_game_logs,
+                                 position_index, matrix, game_log_store, defense_table, games, shooter_filter)
+    return analyze_slate(fetcher, parser, predictor, pos_def, games, workers, position_index, matrix,
+                         game_log_store, defense_table, shooter_filter, injury_index, season_matrix)
+
+
+def analyze_slate(fetcher, parser, predictor, pos_def, games, workers=1, position_index=None, matrix=None,
+                  game_log_store=None, defense_table=None, shooter_filter=None, injury_index=None,
+                  season_matrix=None):
+    """
+    scan_slate without prepare_slate, for callers that already loaded the
+    league-wide data (e.g. the prediction service's refresh)
+    injury_index: prepare_slate's result, None looks injuries up per opponent
+    """
+    slate = []
+    sides = []
+    for game in games:
+        home_team = fetcher.find_team_by_id(game['home_team_id'])
+        away_team = fetcher.find_team_by_id(game['visitor_team_id'])
+
+        if not home_team or not away_team:
+            continue
+
+        matchup = {'game': game, 'home_team': home_team, 'away_team': away_team, 'sides': []}
+        for team, opponent in [(home_team, away_team), (away_team, home_team)]:
+            side = {'team': team, 'opponent': opponent, 'results': None}
+            matchup['sides'].append(side)
+            sides.append(side)
+        slate.append(matchup)
+
+    def fetch_roster(side):
+        roster_response = fetcher.get_team_roster(side['team']['id'])
+        return parser.parse_team_roster(roster_response) if roster_response else None
+
+    def analyze(task):
+        side, player_id, player_name = task
+        return analyze_player(
+            fetcher, parser, predictor, pos_def,
+            player_id, player_name,
+            side['opponent']['id'], side['opponent']['abbreviation'],
+            position_index=position_index, matrix=matrix, game_log_store=game_log_store,
+            defense_table=defense_table, injury_index=injury_index, season_matrix=season_matrix
+        )
+
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    run = executor.map if executor else map
+
+    try:
+        # Rosters first, then one task per player; map() keeps submission order
+        tasks = []
+        for side, player_ids in zip(sides, list(run(fetch_roster, sides))):
+            if player_ids is None:
+                continue
+
+            side['results'] = []
+            for player_id in select_players(player_ids, shooter_filter):
+                player_obj = fetcher.find_player_by_id(player_id)
+                if player_obj:
+                    tasks.append((side, player_id, player_obj['full_name']))
+
+        for (side, _, _), result in zip(tasks, run(analyze, tasks)):
+            if result:
+                result['opponent_abbrev'] = side['opponent']['abbreviation']
+                result['matchup'] = f"{side['team']['abbreviation']} vs {side['opponent']['abbreviation']}"
+                side['results'].append(result)
+    finally:
+        if executor:
+            executor.shutdown()
+        if position_index is not None:
+            position_index.flush()
+
+    return slate
+
+
+def iter_slate(fetcher, parser, predictor, pos_def, games, workers=1, bulk_game_logs=True,
+               position_index=None, matrix=None, game_log_store=None, defense_table=None,
+               max_in_flight=None, shooter_filter=None):
+    """
+    Streaming scan_slate: games -> rosters -> players -> predictions as a
+    generator pipeline, yielding each result as soon as it completes
+    (completion order). Rosters are fetched lazily and at most max_in_flight
+    analyses (default 2 * workers) are queued, so memory stays flat for any
+    slate size. Results carry 'matchup' and 'opponent_abbrev'
+    """
+    games = list(games)
+    injury_index = prepare_slate(fetcher, parser, predictor, pos_def, workers, bulk_game_logs,
+                                 position_index, matrix, game_log_store, defense_table, games, shooter_filter)
+
+    def sides():
+        for game in games:
+            home_team = fetcher.find_team_by_id(game['home_team_id'])
+            away_team = fetcher.find_team_by_id(game['visitor_team_id'])
+            if not home_team or not away_team:
+                continue
+            yield home_team, away_team
+            yield away_team, home_team
+
+    def players():
+        for team, opponent in sides():
+            roster_response = fetcher.get_team_roster(team['id'])
+            if not roster_response:
+                print(f"     Could not fetch {team['abbreviation']} roster")
+                continue
+            for player_id in select_players(parser.parse_team_roster(roster_response), shooter_filter):
+                player_obj = fetcher.find_player_by_id(player_id)
+                if player_obj:
+                    yield team, opponent, player_id, player_obj['full_name']
+
+    def analyze(task):
+        team, opponent, player_id, player_name = task
+        result = analyze_player(
+            fetcher, parser, predictor, pos_def,
+            player_id, player_name,
+            opponent['id'], opponent['abbreviation'],
+            position_index=position_index, matrix=matrix, game_log_store=game_log_store,
+            defense_table=defense_table, injury_index=injury_index
+        )
+        if result:
+            result['opponent_abbrev'] = opponent['abbreviation']
+            result['matchup'] = f"{team['abbreviation']} vs {opponent['abbreviation']}"
+        return result
+
+    if workers <= 1:
+        try:
+            for task in players():
+                result = analyze(task)
+                if result:
+                    yield result
+        finally:
+            if position_index is not None:
+                position_index.flush()
+        return
+
+    limit = max_in_flight or 2 * workers
+    executor = ThreadPoolExecutor(max_workers=workers)
+    in_flight = set()
+    try:
+        for task in players():
+            in_flight.add(executor.submit(analyze, task))
+            if len(in_flight) < limit:
+                continue
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result:
+                    yield result
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result:
+                    yield result
+    finally:
+        # The consumer may stop early; drop whatever has not started
+        executor.shutdown(cancel_futures=True)
+        if position_index is not None:
+            position_index.flush()
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="NBA 3PT Prediction Console")
+    arg_parser.add_argument('--workers', type=int, default=4,
+                            help="threads used to scan today's/tomorrow's games (default: 4)")
+    arg_parser.add_argument('--sequential', action='store_true',
+                            help="scan games one player at a time (same as --workers 1)")
+    arg_parser.add_argument('--incremental', action='store_true',
+                            help="keep game logs on disk and fetch only games played since the last run")
+    arg_parser.add_argument('--defense-table', action='store_true',
+                            help="use measured position splits from the persisted position defense table")
+    arg_parser.add_argument('--nba-rate', type=float, default=None,
+                            help="max stats.nba.com requests per second, shared by all threads")
+    arg_parser.add_argument('--espn-rate', type=float, default=None,
+                            help="max ESPN requests per second, shared by all threads")
+    arg_parser.add_argument('--api-base-url', metavar='URL', default=None,
+                            help="send stats.nba.com and ESPN requests to URL (e.g. the local stand_in_server.py)")
+    arg_parser.add_argument('--no-cache', action='store_true', help="don't read or write the response cache")
+    arg_parser.add_argument('--metrics', metavar='PATH', default=None,
+                            help="record per-stage/per-endpoint metrics and write them to PATH "
+                                 "(.prom for Prometheus text, JSON otherwise) after each scan")
+    arg_parser.add_argument('--confidence-config', metavar='PATH', default=None,
+                            help="confidence weights/thresholds JSON (e.g. from confidence_sweep.py)")
+    return arg_parser.parse_args(argv)
+
+
+def export_metrics(fetcher, path):
+    """Write the fetcher's metrics, with rate limiter stats, to path"""
+    if not path or not fetcher.metrics.enabled:
+        return
+    try:
+        fetcher.metrics.export(path, extra={
+            'rate_limiters': [fetcher.nba_limiter.stats(), fetcher.espn_limiter.stats()]
+        })
+    except OSError as e:
+        print(f"Could not write metrics: {e}")
+
+
+def open_stores(cache_dir=DEFAULT_CACHE_DIR, use_cache=True, incremental=False, use_defense_table=False):
+    """
+    Response cache and persisted stores under cache_dir (see response_cache.cache_dir_for)
+    use_cache: False keeps responses and the position index in memory only
+    Returns: (response cache or None, position index, game log store or None, defense table or None)
+    """
+    def path(default_path):
+        return os.path.join(cache_dir, os.path.basename(default_path))
+
+    cache = ResponseCache(path(DEFAULT_CACHE_PATH)) if use_cache else None
+    position_index = PlayerPositionIndex(path(DEFAULT_INDEX_PATH) if use_cache else None)
+    game_log_store = GameLogStore(path(DEFAULT_STORE_PATH)) if incremental else None
+    defense_table = PositionDefenseTable(path(DEFAULT_TABLE_PATH)) if use_defense_table else None
+    return cache, position_index, game_log_store, defense_table
+
+
+def main(workers=4, incremental=False, use_defense_table=False, metrics_path=None, use_cache=True,
+         confidence_params=None, cache_dir=DEFAULT_CACHE_DIR):
     print("=== NBA 3PT Prediction Console ===\n")
 
-    fetcher = NBADataFetcher()
-    predictor = ThreePointPredictor()
+    cache, position_index, game_log_store, defense_table = open_stores(cache_dir, use_cache, incremental,
+                                                                        use_defense_table)
+    fetcher = NBADataFetcher(cache=cache, use_cache=use_cache, metrics=Metrics() if metrics_path else None)
+    predictor = ThreePointPredictor(confidence_params)
     parser = NBADataParser()
     pos_def = SimplePositionDefense()
+    shooter_filter = ShooterFilter()
+    matrix = MatchupMatrix()
 
     while True:
         print("\nOptions:")
@@ -82,16 +410,28 @@ def main():
         choice = input("\nSelect option (1-4): ").strip()
 
         if choice == '4':
+            export_metrics(fetcher, metrics_path)
             break
         elif choice == '3':
             # Original player search functionality
             player_name = input("Enter player name: ").strip()
-            player_obj = fetcher.find_player_by_name(player_name)
+            candidates = fetcher.player_index.search_scored(player_name, limit=5)
 
-            if not player_obj:
+            if not candidates:
                 print(f"Could not find player: {player_name}")
                 continue
 
+            player_obj = candidates[0][1]
+            if candidates[0][0] < 100 and len(candidates) > 1:
+                # No exact match: let the user pick from the ranked candidates
+                print("\nMatches:")
+                for i, (_, candidate) in enumerate(candidates, 1):
+                    status = "" if candidate.get('is_active') else " (inactive)"
+                    print(f"  {i}. {candidate['full_name']}{status}")
+                pick = input(f"Select player (1-{len(candidates)}, Enter for 1): ").strip()
+                if pick.isdigit() and 1 <= int(pick) <= len(candidates):
+                    player_obj = candidates[int(pick) - 1][1]
+
             print(f"\nFound: {player_obj['full_name']}")
             opponent_abbrev = input("Enter opponent team abbreviation (e.g., LAL, GSW): ").strip().upper()
 
@@ -105,7 +445,11 @@ def main():
             result = analyze_player(
                 fetcher, parser, predictor, pos_def,
                 player_obj['id'], player_obj['full_name'],
-                opponent_team['id'], opponent_abbrev
+                opponent_team['id'], opponent_abbrev,
+                position_index=position_index,
+                matrix=matrix if matrix.is_fresh() else None,
+                game_log_store=game_log_store,
+                defense_table=defense_table
             )
 
             if result:
@@ -130,7 +474,10 @@ def main():
                 print(f"  Season average: {result['stats']['season_3pa_avg']} 3PA/game")
                 print(f"  Last 10 games: {result['stats']['last_10_3pa_avg']} 3PA/game")
 
-                print(f"\n🛡️ {opponent_abbrev} Defense (estimated position splits):")
+                measured = defense_table is not None and defense_table.has_team(opponent_team['id'])
+                splits = (f"measured position splits, last {defense_table.default_window} games" if measured
+                          else "estimated position splits")
+                print(f"\n🛡️ {opponent_abbrev} Defense ({splits}):")
                 print(f"  vs Guards: {result['opponent_defense']['guard_3p_pct_allowed']:.1%}")
                 print(f"  vs Forwards: {result['opponent_defense']['forward_3p_pct_allowed']:.1%}")
                 print(f"  vs Centers: {result['opponent_defense']['center_3p_pct_allowed']:.1%}")
@@ -160,73 +507,67 @@ def main():
         print(f"\n{day_label}'s Games:")
         print("=" * 60)
 
-        all_predictions = []
+        mode = "sequentially" if workers <= 1 else f"with {workers} workers"
+        print(f"Analyzing {len(games)} games {mode}...")
 
         for idx, game in enumerate(games, 1):
             home_team = fetcher.find_team_by_id(game['home_team_id'])
             away_team = fetcher.find_team_by_id(game['visitor_team_id'])
-
-            if not home_team or not away_team:
-                continue
-
-            print(f"\n{idx}. {away_team['full_name']} @ {home_team['full_name']}")
-            print(f"   Status: {game['status']}")
-            print(f"   Analyzing players...")
-
-            # Analyze both teams
-            for team, opponent in [(home_team, away_team), (away_team, home_team)]:
-                print(f"\n   {team['abbreviation']} shooters:")
-
-                # Get roster
-                roster_response = fetcher.get_team_roster(team['id'])
-                if not roster_response:
-                    print(f"     Could not fetch roster")
-                    continue
-
-                player_ids = parser.parse_team_roster(roster_response)
-
-                # Analyze each player
-                count = 0
-                for player_id in player_ids[:10]:
-                    player_obj = next((p for p in fetcher.all_players if p['id'] == player_id), None)
-                    if not player_obj:
-                        continue
-
-                    result = analyze_player(
-                        fetcher, parser, predictor, pos_def,
-                        player_id, player_obj['full_name'],
-                        opponent['id'], opponent['abbreviation']
-                    )
-
-                    if result:
-                        result['opponent_abbrev'] = opponent['abbreviation']
-                        result['matchup'] = f"{team['abbreviation']} vs {opponent['abbreviation']}"
-                        all_predictions.append(result)
-
-                        if result['confidence_tier'] in ['HIGH', 'MEDIUM']:
-                            print(f"     ✓ {result['name']}: {result['prediction']} ({result['confidence_tier']})")
-                            count += 1
-
-                if count == 0:
-                    print(f"     No qualifying shooters found")
+            if home_team and away_team:
+                print(f"{idx}. {away_team['full_name']} @ {home_team['full_name']} ({game['status']})")
+
+        print("\nQualifying shooters (as they complete):")
+
+        # Only the best picks are kept; everything else is printed and dropped
+        high_conf = TopK(10, key=lambda pick: pick['confidence_score'])
+        analyzed = 0
+
+        for result in iter_slate(fetcher, parser, predictor, pos_def, games, workers=workers,
+                                 position_index=position_index, matrix=matrix, game_log_store=game_log_store,
+                                 defense_table=defense_table, shooter_filter=shooter_filter):
+            analyzed += 1
+            if result['confidence_tier'] in ['HIGH', 'MEDIUM']:
+                print(f"     ✓ {result['name']} ({result['matchup']}): {result['prediction']} "
+                      f"({result['confidence_tier']})")
+
+            if result['confidence_tier'] == 'HIGH':
+                high_conf.push({
+                    'name': result['name'],
+                    'matchup': result['matchup'],
+                    'prediction': result['prediction'],
+                    'confidence_score': result['confidence_score'],
+                    'recent_avg': sum(result['stats']['last_5_3pm']) / 5,
+                    'opp_3p_pct_allowed': result['opponent_defense']['opp_3p_pct_allowed']
+                })
+
+        print(f"\n   {analyzed} shooters analyzed")
+        for limiter in (fetcher.nba_limiter, fetcher.espn_limiter):
+            stats = limiter.stats()
+            print(f"   {stats['name']}: {stats['requests']} requests, {stats['io_time']:.1f}s I/O, "
+                  f"{stats['wait_time']:.1f}s waiting, {stats['throttled']} throttled")
+        export_metrics(fetcher, metrics_path)
 
         # Show high confidence picks
         print(f"\n{'=' * 60}")
         print(f"HIGH CONFIDENCE PICKS FOR {day_label.upper()}:")
         print(f"{'=' * 60}\n")
 
-        high_conf = [p for p in all_predictions if p['confidence_tier'] == 'HIGH']
-        high_conf.sort(key=lambda x: x['confidence_score'], reverse=True)
-
-        if high_conf:
-            for i, pick in enumerate(high_conf[:10], 1):
+        if len(high_conf):
+            for i, pick in enumerate(high_conf.items(), 1):
                 print(f"{i}. {pick['name']} ({pick['matchup']})")
                 print(f"   Prediction: {pick['prediction']} threes | Confidence: {pick['confidence_score']}/100")
-                print(f"   Recent avg: {sum(pick['stats']['last_5_3pm']) / 5:.1f} per game")
-                print(f"   Opponent allows: {pick['opponent_defense']['opp_3p_pct_allowed']:.1%} from three\n")
+                print(f"   Recent avg: {pick['recent_avg']:.1f} per game")
+                print(f"   Opponent allows: {pick['opp_3p_pct_allowed']:.1%} from three\n")
         else:
             print("No high confidence picks found.\n")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    NBADataFetcher.configure_rate_limits(nba_rate=args.nba_rate, espn_rate=args.espn_rate)
+    NBADataFetcher.configure_endpoints(nba_base_url=args.api_base_url, espn_base_url=args.api_base_url)
+    main(workers=1 if args.sequential else max(1, args.workers), incremental=args.incremental,
+         use_defense_table=args.defense_table, metrics_path=args.metrics,
+         use_cache=not args.no_cache,
+         confidence_params=load_confidence_params(args.confidence_config) if args.confidence_config else None,
+         cache_dir=cache_dir_for(args.api_base_url))
\ No newline at end of file
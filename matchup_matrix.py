@@ -0,0 +1,235 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from position_index import PlayerPositionIndex
+
+
+class _MatrixSnapshot:
+    """One built matrix; never modified after construction, so readers need no lock"""
+
+    def __init__(self, player_rows, teams, player_stats, positions, opponent_stats, injuries, injury_impacts,
+                 base_prediction, prediction, confidence_score, confidence_tier):
+        self.player_rows = player_rows  # player_id -> row
+        self.team_cols = {team['id']: col for col, team in enumerate(teams)}  # team_id -> column
+        self.teams = teams
+        self.player_stats = player_stats
+        self.positions = positions
+        self.opponent_stats = opponent_stats
+        self.injuries = injuries
+        self.injury_impacts = injury_impacts
+        self.base_prediction = base_prediction
+        self.prediction = prediction
+        self.confidence_score = confidence_score
+        self.confidence_tier = confidence_tier
+        self.built_at = time.time()
+
+    def has_matchup(self, player_id, team_id):
+        return player_id in self.player_rows and team_id in self.team_cols
+
+
+class MatchupMatrix:
+    """
+    Prediction and confidence for every player with a usable game log
+    against all 30 opponents, computed in one predict_batch pass
+    Lookups by (player_id, team_id) are two dict hits and an array index
+    A rebuild swaps in a whole new snapshot, so concurrent readers see
+    either the old matrix or the new one, never a mix
+    """
+
+    def __init__(self, ttl=600, min_3pa=3.0):
+        self.ttl = ttl  # injuries change quickly, so rebuild after a few minutes
+        self.min_3pa = min_3pa
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _fresh_snapshot(self):
+        """Current snapshot if it is within the TTL, else None (read once per lookup)"""
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - snapshot.built_at > self.ttl:
+            return None
+        return snapshot
+
+    def is_fresh(self):
+        return self._fresh_snapshot() is not None
+
+    def invalidate(self):
+        """Stop serving the current matrix; the next ensure_built rebuilds it"""
+        self._snapshot = None
+
+    def ensure_built(self, fetcher, parser, predictor, pos_def, position_index=None, workers=4,
+                     season="2025-26", game_log_store=None, defense_table=None):
+        """Build the matrix if it is missing or older than the TTL"""
+        with self._lock:
+            if self.is_fresh():
+                return True
+            return self._build(fetcher, parser, predictor, pos_def, position_index, workers, season,
+                               game_log_store, defense_table)
+
+    def build(self, fetcher, parser, predictor, pos_def, position_index=None, workers=4, season="2025-26",
+              game_log_store=None, defense_table=None):
+        """
+        Rebuild the matrix from the league game log, team defense and injuries
+        game_log_store: read player stats from a synced GameLogStore instead of the league index
+        defense_table: use measured position splits from a PositionDefenseTable where available
+        """
+        with self._lock:
+            return self._build(fetcher, parser, predictor, pos_def, position_index, workers, season,
+                               game_log_store, defense_table)
+
+    def _iter_player_stats(self, fetcher, parser, season, game_log_store):
+        """(player_id, stats) for every player with a usable log"""
+        if game_log_store is not None:
+            for player_id in game_log_store.player_ids():
+                yield player_id, game_log_store.get_player_stats(player_id)
+        else:
+            for player_id, game_log in fetcher.league_game_logs[season].items():
+                yield player_id, parser.parse_player_game_log(game_log)
+
+    def _build(self, fetcher, parser, predictor, pos_def, position_index, workers, season, game_log_store=None,
+               defense_table=None):
+        import numpy as np
+        print("   Building matchup matrix...")
+
+        if game_log_store is None and season not in fetcher.league_game_logs \
+                and not fetcher.load_league_game_logs(season):
+            print("   Could not load league game logs")
+            return False
+
+        if position_index is None:
+            position_index = PlayerPositionIndex(season=season)
+        position_index.ensure_built(fetcher, parser)
+
+        # Players: parser-equivalent stats straight from the league index (or store)
+        player_rows = {}
+        player_stats = []
+        positions = []
+        for player_id, stats in self._iter_player_stats(fetcher, parser, season, game_log_store):
+            if not stats:
+                continue
+            position = position_index.lookup(player_id)
+            if position is None and stats['3pa_per_game'] >= self.min_3pa:
+                position = position_index.get_position(fetcher, parser, player_id)
+            player_rows[player_id] = len(player_stats)
+            player_stats.append(stats)
+            positions.append(position or 'SG')
+        position_index.flush()
+
+        if not player_stats:
+            print("   No players with enough games")
+            return False
+
+        # Opponents: position defense and injuries for all 30 teams
+        def load_team(team):
+            injuries = parser.parse_injuries(fetcher.get_team_injuries(team['abbreviation']))
+            if defense_table is not None and defense_table.has_team(team['id']):
+                return defense_table.get_position_defense_stats(team['id']), injuries
+
+            defense_response = fetcher.get_team_defense_stats(team['id'], season)
+            overall_defense = parser.parse_team_defense_stats(defense_response) if defense_response else 0.365
+            return pos_def.get_position_defense_stats(overall_defense), injuries
+
+        teams = list(fetcher.all_teams)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                team_data = list(executor.map(load_team, teams))
+        else:
+            team_data = [load_team(team) for team in teams]
+
+        opponent_stats = [stats for stats, _ in team_data]
+        injuries = [team_injuries for _, team_injuries in team_data]
+        impacts = [
+            predictor.injury_impact(team_injuries, team['abbreviation'])
+            for team, team_injuries in zip(teams, injuries)
+        ]
+        injured_out = [len(impact['out_defenders']) for impact in impacts]
+
+        # One vectorized pass over every (player, opponent) pair
+        n_players, n_teams = len(player_stats), len(teams)
+        windows = predictor._pad_windows([stats['last_10_3pm'] for stats in player_stats])
+        attempts = np.array([stats['3pa_per_game'] for stats in player_stats], dtype=float)
+        defense = np.array([predictor.defense_vector(stats) for stats in opponent_stats], dtype=float)
+
+        batch = predictor.predict_batch(
+            np.repeat(windows, n_teams, axis=0),
+            np.repeat(attempts, n_teams),
+            np.repeat(np.array(positions, dtype=object), n_teams),
+            np.tile(defense, (n_players, 1)),
+            np.tile(np.array(injured_out, dtype=int), n_players)
+        )
+
+        self._snapshot = _MatrixSnapshot(
+            player_rows, teams, player_stats, positions, opponent_stats, injuries, impacts,
+            batch['base_prediction'].reshape(n_players, n_teams),
+            batch['prediction'].reshape(n_players, n_teams),
+            batch['confidence_score'].reshape(n_players, n_teams),
+            batch['confidence_tier'].reshape(n_players, n_teams)
+        )
+
+        print(f"   Matchup matrix: {n_players} players x {n_teams} opponents")
+        return True
+
+    def has_matchup(self, player_id, team_id):
+        """True if the matrix is fresh and knows this player and opponent"""
+        snapshot = self._fresh_snapshot()
+        return snapshot is not None and snapshot.has_matchup(player_id, team_id)
+
+    def get(self, player_id, team_id):
+        """(prediction, confidence_score, confidence_tier) or None"""
+        snapshot = self._fresh_snapshot()
+        if snapshot is None or not snapshot.has_matchup(player_id, team_id):
+            return None
+        row, col = snapshot.player_rows[player_id], snapshot.team_cols[team_id]
+        return (float(snapshot.prediction[row, col]), int(snapshot.confidence_score[row, col]),
+                str(snapshot.confidence_tier[row, col]))
+
+    def player_row(self, player_id):
+        """[(team abbreviation, prediction, confidence_score, tier)] against every opponent, best first"""
+        snapshot = self._fresh_snapshot()
+        if snapshot is None or player_id not in snapshot.player_rows:
+            return []
+        row = snapshot.player_rows[player_id]
+        matchups = [
+            (team['abbreviation'], float(snapshot.prediction[row, col]), int(snapshot.confidence_score[row, col]),
+             str(snapshot.confidence_tier[row, col]))
+            for col, team in enumerate(snapshot.teams)
+        ]
+        return sorted(matchups, key=lambda m: m[1], reverse=True)
+
+    def result(self, predictor, player_id, player_name, team_id):
+        """
+        analyze_player-shaped result for a matchup, or None if the player
+        is below the 3PA volume filter or the matchup is unknown
+        """
+        snapshot = self._fresh_snapshot()
+        if snapshot is None or not snapshot.has_matchup(player_id, team_id):
+            return None
+
+        row, col = snapshot.player_rows[player_id], snapshot.team_cols[team_id]
+        stats = snapshot.player_stats[row]
+        if stats['3pa_per_game'] < self.min_3pa:
+            return None
+
+        position = snapshot.positions[row]
+        team = snapshot.teams[col]
+        opponent_stats = snapshot.opponent_stats[col]
+        injuries = snapshot.injuries[col]
+        impact = snapshot.injury_impacts[col]
+
+        # Flags are display text only; the numbers come from the matrix
+        _, flags = predictor.calculate_confidence(stats, opponent_stats, position, injuries, team['abbreviation'],
+                                                  impact=impact)
+        injured_defenders = list(impact['out_defenders'])
+
+        return {
+            'name': player_name,
+            'position': position,
+            'prediction': snapshot.prediction[row, col],
+            'base_prediction': snapshot.base_prediction[row, col],
+            'confidence_score': int(snapshot.confidence_score[row, col]),
+            'confidence_tier': str(snapshot.confidence_tier[row, col]),
+            'flags': flags,
+            'stats': stats,
+            'injured_defenders': injured_defenders,
+            'opponent_defense': opponent_stats
+        }
@@ -1,4 +1,3 @@
-import numpy as np
 from datetime import datetime
 
 
@@ -11,6 +10,7 @@ class NBADataParser:
         use_season_avg: If True, use full season average for 3PA, else use last 10 games
         Returns: dict with last_5_3pm, last_10_3pm, 3pa_per_game, and dates
         """
+        import numpy as np
         try:
             result_set = response_dict['resultSets'][0]
             headers = result_set['headers']
@@ -82,24 +82,78 @@ class NBADataParser:
             row = result_set['rowSet'][0]
 
             position_idx = headers.index('POSITION')
-            position = row[position_idx]
+            return self.normalize_position(row[position_idx])
+        except (KeyError, IndexError) as e:
+            print(f"    Error parsing player info: {e}")
+            return 'SG'
 
-            if not position:
-                return 'SG'
+    def normalize_position(self, position):
+        """
+        Map an NBA position ('Guard-Forward', 'F-C', ...) to SG/SF/PF/C
+        Rosters and the player index use abbreviations, player info spells them out
+        """
+        if not position:
+            return 'SG'
 
-            if 'Guard' in position:
-                return 'SG'
-            elif 'Forward' in position:
-                if 'Center' in position:
-                    return 'PF'
-                return 'SF'
-            elif 'Center' in position:
-                return 'C'
+        abbreviations = {'G': 'Guard', 'F': 'Forward', 'C': 'Center'}
+        position = '-'.join(abbreviations.get(part, part) for part in position.split('-'))
 
-            return position
-        except (KeyError, IndexError) as e:
-            print(f"    Error parsing player info: {e}")
+        if 'Guard' in position:
             return 'SG'
+        elif 'Forward' in position:
+            if 'Center' in position:
+                return 'PF'
+            return 'SF'
+        elif 'Center' in position:
+            return 'C'
+
+        return position
+
+    def parse_player_positions(self, response_dict, id_key='PLAYER_ID'):
+        """
+        Extract {player_id: position} from a roster or player index response
+        id_key: 'PLAYER_ID' for CommonTeamRoster, 'PERSON_ID' for PlayerIndex
+        """
+        try:
+            result_set = response_dict['resultSets'][0]
+            headers = result_set['headers']
+            rows = result_set['rowSet']
+
+            player_id_idx = headers.index(id_key)
+            position_idx = headers.index('POSITION')
+
+            positions = {}
+            for row in rows:
+                positions[row[player_id_idx]] = self.normalize_position(row[position_idx])
+
+            return positions
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"    Error parsing player positions: {e}")
+            return {}
+
+    def parse_league_player_stats(self, response_dict):
+        """
+        Extract season totals from LeagueDashPlayerStats
+        Returns: {player_id: {'team_id', 'gp', 'fg3m', 'fg3a'}}
+        """
+        try:
+            result_set = response_dict['resultSets'][0]
+            headers = result_set['headers']
+            idx = {name: headers.index(name) for name in ('PLAYER_ID', 'TEAM_ID', 'GP', 'FG3M', 'FG3A')}
+
+            stats = {}
+            for row in result_set['rowSet']:
+                stats[row[idx['PLAYER_ID']]] = {
+                    'team_id': row[idx['TEAM_ID']],
+                    'gp': row[idx['GP']] or 0,
+                    'fg3m': row[idx['FG3M']] or 0,
+                    'fg3a': row[idx['FG3A']] or 0
+                }
+
+            return stats
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"    Error parsing league player stats: {e}")
+            return {}
 
     def parse_team_defense_stats(self, response_dict):
         """Extract opponent 3P% allowed"""
@@ -259,8 +313,11 @@ class NBADataParser:
             print(f"    Error parsing roster: {e}")
             return []
 
-    def parse_scoreboard(self, response_dict):
-        """Extract today's games"""
+    def parse_scoreboard(self, response_dict, include_final=False):
+        """
+        Extract today's games
+        include_final: keep games that have finished (for past dates)
+        """
         try:
             games = []
 
@@ -275,7 +332,7 @@ class NBADataParser:
 
             for row in rows:
                 game_status = row[game_status_idx]
-                if 'Final' not in game_status:
+                if include_final or 'Final' not in game_status:
                     games.append({
                         'game_id': row[game_id_idx],
                         'home_team_id': row[home_team_id_idx],
@@ -0,0 +1,111 @@
+import bisect
+import re
+import unicodedata
+
+
+def fold_name(name):
+    """Lowercase, strip accents and punctuation: "Nikola Jokić" -> "nikola jokic", "De'Aaron" -> "deaaron" """
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = re.sub(r"[.'’]", '', name.lower())
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', name).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerSearchIndex:
+    """
+    Prebuilt name index over the nba_api static player list
+    Lookups by id are a dict hit; name searches match whole tokens, then
+    token prefixes, then trigram similarity for misspellings, and rank
+    candidates by match quality with active players first
+    """
+
+    def __init__(self, player_list):
+        self.by_id = {}
+        self._folded = {}
+        self._token_ids = {}
+        self._trigram_ids = {}
+        self._gram_counts = {}
+
+        for player in player_list:
+            player_id = player['id']
+            folded = fold_name(player['full_name'])
+            self.by_id[player_id] = player
+            self._folded[player_id] = folded
+
+            for token in folded.split():
+                self._token_ids.setdefault(token, set()).add(player_id)
+            grams = trigrams(folded)
+            self._gram_counts[player_id] = len(grams)
+            for gram in grams:
+                self._trigram_ids.setdefault(gram, set()).add(player_id)
+
+        self._tokens = sorted(self._token_ids)
+
+    def get(self, player_id):
+        return self.by_id.get(player_id)
+
+    def _ids_for_token(self, token):
+        """(exact ids, prefix-only ids) for one query token"""
+        exact = self._token_ids.get(token, set())
+        prefix = set()
+        i = bisect.bisect_left(self._tokens, token)
+        while i < len(self._tokens) and self._tokens[i].startswith(token):
+            if self._tokens[i] != token:
+                prefix |= self._token_ids[self._tokens[i]]
+            i += 1
+        return exact, prefix - exact
+
+    def search_scored(self, name, limit=5):
+        """Ranked [(score, player)] for a query, best first"""
+        query = fold_name(name)
+        if not query:
+            return []
+
+        scores = {}
+        query_tokens = query.split()
+
+        # Every query token must match a name token exactly or as a prefix
+        candidates = None
+        exact_counts = {}
+        for token in query_tokens:
+            exact, prefix = self._ids_for_token(token)
+            matched = exact | prefix
+            candidates = matched if candidates is None else candidates & matched
+            for player_id in exact:
+                exact_counts[player_id] = exact_counts.get(player_id, 0) + 1
+
+        for player_id in candidates or ():
+            if self._folded[player_id] == query:
+                scores[player_id] = 100.0
+            else:
+                scores[player_id] = 70.0 + 20.0 * exact_counts.get(player_id, 0) / len(query_tokens)
+
+        # Misspellings: trigram (Jaccard) similarity over the whole name
+        if len(scores) < limit:
+            query_grams = trigrams(query)
+            overlaps = {}
+            for gram in query_grams:
+                for player_id in self._trigram_ids.get(gram, ()):
+                    overlaps[player_id] = overlaps.get(player_id, 0) + 1
+
+            for player_id, overlap in overlaps.items():
+                if player_id in scores:
+                    continue
+                similarity = overlap / (len(query_grams) + self._gram_counts[player_id] - overlap)
+                if similarity >= 0.3:
+                    scores[player_id] = 60.0 * similarity
+
+        ranked = sorted(
+            scores.items(),
+            key=lambda item: (-item[1], not self.by_id[item[0]].get('is_active'), self._folded[item[0]])
+        )
+        return [(score, self.by_id[player_id]) for player_id, score in ranked[:limit]]
+
+    def search(self, name, limit=5):
+        """Ranked candidate players for a query, best first"""
+        return [player for _, player in self.search_scored(name, limit)]
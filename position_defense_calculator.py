@@ -1,13 +1,21 @@
-from nba_api.stats.endpoints import teamgamelog, boxscoretraditionalv2
-import time
-import numpy as np
+from box_score_store import shared_box_scores
+from ttl_cache import TTLCache
 
 
 class PositionDefenseCalculator:
     """Calculate position-specific defense by aggregating game data"""
 
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, position_index=None, box_scores=None, workers=4, games_per_team=10,
+                 defense_ttl=6 * 3600, position_ttl=3 * 24 * 3600):
+        # (team_id, season) -> (latest completed game_id, result); also dropped as soon as
+        # the team's game log shows a newer completed game
+        self.defense_cache = TTLCache(maxsize=64, ttl=defense_ttl, name='position_defense')
+        # player_id -> position group
+        self.position_cache = TTLCache(maxsize=2000, ttl=position_ttl, name='player_position')
+        self.position_index = position_index
+        self.box_scores = box_scores if box_scores is not None else shared_box_scores
+        self.workers = workers
+        self.games_per_team = games_per_team
 
     def get_position_defense_stats(self, fetcher, parser, team_id, season="2025-26"):
         """
@@ -15,27 +23,22 @@ class PositionDefenseCalculator:
         Returns: dict with guard/forward/center 3P% allowed
         """
 
-        # Check cache first
-        cache_key = f"{team_id}_{season}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-
-        print(f"      Calculating position defense for team {team_id}...")
+        cache_key = (team_id, season)
 
         try:
-            # Get team's game log for the season
-            team_games = teamgamelog.TeamGameLog(
-                team_id=team_id,
-                season=season,
-                season_type_all_star='Regular Season'
-            )
-            time.sleep(0.6)
+            # The team game log is cached until the daily rollover, so this check is cheap
+            completed_games = self._get_completed_games(fetcher, team_id, season)
+            latest_game_id = completed_games[0]['game_id'] if completed_games else None
 
-            games_data = team_games.get_dict()
-            games = self._parse_team_game_log(games_data)
+            # Check cache first; a new completed game makes the entry stale
+            cached = self.defense_cache.get(cache_key)
+            if cached is not None:
+                cached_game_id, cached_result = cached
+                if cached_game_id == latest_game_id:
+                    return cached_result
+                self.defense_cache.invalidate(cache_key)
 
-            # Filter to only completed games (have 'W' or 'L' result)
-            completed_games = [g for g in games if g['wl'] in ['W', 'L']]
+            print(f"      Calculating position defense for team {team_id}...")
 
             print(f"      Found {len(completed_games)} completed games")
 
@@ -56,7 +59,13 @@ class PositionDefenseCalculator:
             }
 
             games_processed = 0
-            games_to_process = min(10, len(completed_games))  # Process up to 10 recent games
+            games_to_process = min(self.games_per_team, len(completed_games))  # Process up to 10 recent games
+
+            # Download the missing box scores concurrently; games already fetched
+            # for another team (same game, other side) come from the shared store
+            self.box_scores.prefetch(
+                fetcher, [g['game_id'] for g in completed_games[:games_to_process]], self.workers
+            )
 
             for i, game in enumerate(completed_games):
                 if games_processed >= games_to_process:
@@ -68,13 +77,10 @@ class PositionDefenseCalculator:
 
                 # Get box score for this game
                 try:
-                    box_score = boxscoretraditionalv2.BoxScoreTraditionalV2(game_id=game_id)
-                    time.sleep(0.6)
-
-                    box_data = box_score.get_dict()
+                    box_data = self.box_scores.get(fetcher, game_id)
 
                     # Check if box score has data
-                    if not self._has_box_score_data(box_data):
+                    if not box_data or not self._has_box_score_data(box_data):
                         print(f"        No box score data available for game {game_id}")
                         continue
 
@@ -144,7 +150,7 @@ class PositionDefenseCalculator:
                 f"        Centers: {result['center_3p_pct_allowed']:.1%} ({position_stats['center']['made']}/{position_stats['center']['attempted']})")
 
             # Cache the result
-            self.cache[cache_key] = result
+            self.defense_cache.set(cache_key, (latest_game_id, result))
 
             return result
 
@@ -160,6 +166,50 @@ class PositionDefenseCalculator:
                 'opp_3p_pct_allowed': 0.365
             }
 
+    def compute_all(self, fetcher, parser, team_ids, season="2025-26"):
+        """
+        Position defense for many teams (e.g. all 30) with one box score
+        request per distinct league game: every team's recent games are
+        collected first and downloaded once, concurrently
+        Returns: {team_id: position defense dict}
+        """
+        game_ids = []
+        for team_id in team_ids:
+            if (team_id, season) in self.defense_cache:
+                continue
+            completed_games = self._get_completed_games(fetcher, team_id, season)
+            game_ids.extend(g['game_id'] for g in completed_games[:self.games_per_team])
+
+        fetched = self.box_scores.prefetch(fetcher, game_ids, self.workers)
+        print(f"      Prefetched {fetched} box scores for {len(set(game_ids))} distinct games")
+
+        return {
+            team_id: self.get_position_defense_stats(fetcher, parser, team_id, season)
+            for team_id in team_ids
+        }
+
+    def invalidate_teams(self, team_ids, season=None):
+        """Drop cached defense for teams with new games (all seasons if season is None)"""
+        team_ids = set(team_ids)
+        return self.defense_cache.invalidate_where(
+            lambda key: key[0] in team_ids and (season is None or key[1] == season)
+        )
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters for each cache"""
+        return [self.defense_cache.stats(), self.position_cache.stats()]
+
+    def _get_completed_games(self, fetcher, team_id, season):
+        """Team's games with a W/L result, newest first"""
+        games_data = fetcher.get_team_game_log(team_id, season)
+        if not games_data:
+            return []
+
+        games = self._parse_team_game_log(games_data)
+
+        # Filter to only completed games (have 'W' or 'L' result)
+        return [g for g in games if g['wl'] in ['W', 'L']]
+
     def _parse_team_game_log(self, games_data):
         """Extract game IDs and W/L from team game log"""
         result_set = games_data['resultSets'][0]
@@ -251,16 +301,19 @@ class PositionDefenseCalculator:
 
     def _get_player_position_cached(self, fetcher, parser, player_id):
         """Get player position with caching"""
-        cache_key = f"pos_{player_id}"
-
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        pos_group = self.position_cache.get(player_id)
+        if pos_group is not None:
+            return pos_group
 
         try:
-            player_info = fetcher.get_player_info(player_id)
-            if player_info:
-                position = parser.parse_player_info(player_info)
-
+            if self.position_index is not None:
+                # Bulk index first, per-player request only on a miss
+                position = self.position_index.get_position(fetcher, parser, player_id)
+            else:
+                player_info = fetcher.get_player_info(player_id)
+                position = parser.parse_player_info(player_info) if player_info else None
+
+            if position:
                 # Map to position group
                 if position in ['PG', 'SG', 'G']:
                     pos_group = 'guard'
@@ -269,7 +322,7 @@ class PositionDefenseCalculator:
                 else:  # C
                     pos_group = 'center'
 
-                self.cache[cache_key] = pos_group
+                self.position_cache.set(player_id, pos_group)
                 return pos_group
         except:
             pass
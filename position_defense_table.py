@@ -0,0 +1,250 @@
+import os
+import sqlite3
+import threading
+
+from box_score_store import BoxScoreStore
+from position_defense_calculator import PositionDefenseCalculator
+from position_index import PlayerPositionIndex
+from response_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_TABLE_PATH = os.path.join(DEFAULT_CACHE_DIR, 'position_defense.sqlite')
+
+POSITION_GROUPS = ('guard', 'forward', 'center')
+LEAGUE_AVG_3P_PCT = 0.365
+
+
+def _position_group(position):
+    if position in ['PG', 'SG', 'G']:
+        return 'guard'
+    elif position in ['SF', 'PF', 'F']:
+        return 'forward'
+    return 'center'
+
+
+class PositionDefenseTable:
+    """
+    Persisted league-wide made/attempted 3PT counters per
+    (defending team, game, position group)
+    update() ingests only games not processed yet; lookups for any rolling
+    window (last N games or season) are served from memory
+    """
+
+    def __init__(self, path=DEFAULT_TABLE_PATH, season="2025-26", default_window=10):
+        self.path = path
+        self.season = season
+        self.default_window = default_window
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS defense_counts ('
+                'season TEXT NOT NULL, '
+                'defending_team_id INTEGER NOT NULL, '
+                'game_id TEXT NOT NULL, '
+                'game_date TEXT NOT NULL, '
+                'position_group TEXT NOT NULL, '
+                'made INTEGER NOT NULL, '
+                'attempted INTEGER NOT NULL, '
+                'PRIMARY KEY (season, defending_team_id, game_id, position_group))'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS processed_games ('
+                'season TEXT NOT NULL, '
+                'game_id TEXT NOT NULL, '
+                'PRIMARY KEY (season, game_id))'
+            )
+            self._conn.commit()
+
+        self._team_games = None  # team_id -> [(game_date, game_id, {group: (made, attempted)})], newest first
+        self._results = {}  # (team_id, window) -> position defense dict
+
+    def _processed_game_ids(self):
+        rows = self._conn.execute(
+            'SELECT game_id FROM processed_games WHERE season = ?', (self.season,)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def _league_games(self, fetcher):
+        """{game_id: game_date} for every completed game of the season"""
+        response = fetcher.get_league_team_game_log(self.season)
+        if not response:
+            return {}
+
+        result_set = response['resultSets'][0]
+        headers = result_set['headers']
+        game_id_idx = headers.index('GAME_ID')
+        date_idx = headers.index('GAME_DATE')
+        wl_idx = headers.index('WL')
+
+        return {
+            row[game_id_idx]: row[date_idx][:10]
+            for row in result_set['rowSet']
+            if row[wl_idx] in ('W', 'L')
+        }
+
+    def update(self, fetcher, parser, position_index=None, workers=4, box_scores=None, batch_size=50):
+        """
+        Ingest every completed game not processed yet (e.g. last night's games)
+        Box scores are fetched batch_size games at a time into a private store
+        and dropped once their counters are written, so a season's backlog never
+        stays in memory (pass box_scores to keep them in a caller-owned store)
+        Returns: number of games ingested
+        """
+        league_games = self._league_games(fetcher)
+        with self._lock:
+            new_games = sorted(set(league_games) - self._processed_game_ids())
+
+        if not new_games:
+            return 0
+
+        print(f"      Ingesting {len(new_games)} new games into position defense table...")
+
+        if position_index is None:
+            position_index = PlayerPositionIndex(season=self.season)
+        position_index.ensure_built(fetcher, parser)
+
+        ingested = 0
+        for start in range(0, len(new_games), batch_size):
+            batch = new_games[start:start + batch_size]
+            batch_box_scores = box_scores if box_scores is not None else BoxScoreStore()
+            batch_box_scores.prefetch(fetcher, batch, workers)
+            ingested += self._ingest_games(fetcher, parser, position_index, batch_box_scores, batch, league_games)
+
+        position_index.flush()
+        with self._lock:
+            self._team_games = None
+            self._results = {}
+
+        print(f"      Position defense table: {ingested} games ingested")
+        return ingested
+
+    def _ingest_games(self, fetcher, parser, position_index, box_scores, game_ids, league_games):
+        """Write the position counters for each game's box score; returns games ingested"""
+        # Reuse the calculator's box score parsing
+        calculator = PositionDefenseCalculator(position_index=position_index, box_scores=box_scores)
+
+        ingested = 0
+        for game_id in game_ids:
+            box_data = box_scores.get(fetcher, game_id)
+            if not box_data or not calculator._has_box_score_data(box_data):
+                continue
+
+            team_ids = self._team_ids(box_data)
+            if len(team_ids) != 2:
+                continue
+
+            rows = []
+            for defending_team_id in team_ids:
+                shooting_team_id = team_ids[0] if defending_team_id == team_ids[1] else team_ids[1]
+                counts = {group: [0, 0] for group in POSITION_GROUPS}
+
+                for player_stat in calculator._parse_opponent_box_score(box_data, shooting_team_id):
+                    if player_stat['fg3a'] == 0:
+                        continue
+                    position = position_index.get_position(fetcher, parser, player_stat['player_id'])
+                    group = _position_group(position)
+                    counts[group][0] += player_stat['fg3m']
+                    counts[group][1] += player_stat['fg3a']
+
+                for group, (made, attempted) in counts.items():
+                    rows.append((self.season, defending_team_id, game_id, league_games[game_id], group,
+                                 made, attempted))
+
+            with self._lock:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO defense_counts '
+                    '(season, defending_team_id, game_id, game_date, position_group, made, attempted) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO processed_games (season, game_id) VALUES (?, ?)',
+                    (self.season, game_id)
+                )
+                self._conn.commit()
+            ingested += 1
+
+        return ingested
+
+    def _team_ids(self, box_data):
+        """Both team IDs in a box score, in order of appearance"""
+        for result_set in box_data['resultSets']:
+            if result_set['name'] == 'PlayerStats':
+                team_id_idx = result_set['headers'].index('TEAM_ID')
+                return list(dict.fromkeys(row[team_id_idx] for row in result_set['rowSet']))
+        return []
+
+    def _load(self):
+        """Group stored counters by defending team, newest game first"""
+        rows = self._conn.execute(
+            'SELECT defending_team_id, game_id, game_date, position_group, made, attempted '
+            'FROM defense_counts WHERE season = ?',
+            (self.season,)
+        ).fetchall()
+
+        games = {}
+        for team_id, game_id, game_date, group, made, attempted in rows:
+            games.setdefault(team_id, {}).setdefault((game_date, game_id), {})[group] = (made, attempted)
+
+        self._team_games = {
+            team_id: [(game_date, game_id, counts) for (game_date, game_id), counts in sorted(
+                team_games.items(), reverse=True)]
+            for team_id, team_games in games.items()
+        }
+
+    def has_team(self, team_id):
+        with self._lock:
+            if self._team_games is None:
+                self._load()
+            return bool(self._team_games.get(team_id))
+
+    def get_position_defense_stats(self, team_id, last_n=None):
+        """
+        Team's 3P% allowed by position group over its last_n games
+        (default_window if None, 0 for the whole season), same dict shape
+        as PositionDefenseCalculator
+        """
+        window = self.default_window if last_n is None else last_n
+
+        with self._lock:
+            key = (team_id, window)
+            if key in self._results:
+                return self._results[key]
+
+            if self._team_games is None:
+                self._load()
+
+            team_games = self._team_games.get(team_id, [])
+            if window:
+                team_games = team_games[:window]
+
+            totals = {group: [0, 0] for group in POSITION_GROUPS}
+            for _, _, counts in team_games:
+                for group, (made, attempted) in counts.items():
+                    totals[group][0] += made
+                    totals[group][1] += attempted
+
+            result = {
+                f'{group}_3p_pct_allowed': made / attempted if attempted else LEAGUE_AVG_3P_PCT
+                for group, (made, attempted) in totals.items()
+            }
+            total_made = sum(made for made, _ in totals.values())
+            total_attempted = sum(attempted for _, attempted in totals.values())
+            result['opp_3p_pct_allowed'] = total_made / total_attempted if total_attempted else LEAGUE_AVG_3P_PCT
+
+            self._results[key] = result
+            return result
+
+
+if __name__ == "__main__":
+    # Nightly refresh: only games finished since the last run are downloaded
+    from data_fetcher import NBADataFetcher
+    from parser import NBADataParser
+
+    table = PositionDefenseTable()
+    table.update(NBADataFetcher(), NBADataParser())
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+
+from response_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_INDEX_PATH = os.path.join(DEFAULT_CACHE_DIR, 'positions.json')
+
+
+class PlayerPositionIndex:
+    """
+    Persistent player_id -> position (SG/SF/PF/C) index
+    Built from one league-wide PlayerIndex call (or the 30 team rosters),
+    with a per-player CommonPlayerInfo request only for misses
+    path: JSON file the index is loaded from and saved to, None keeps it in memory
+    save_interval: seconds between saves of positions learned from misses
+                   (flush() writes any that are still pending)
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, max_age_days=3, season="2025-26", save_interval=60):
+        self.path = path
+        self.max_age = max_age_days * 24 * 3600
+        self.season = season
+        self.positions = {}
+        self.built_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.save_interval = save_interval
+        self._dirty = False
+        self._last_save = time.time()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._last_build_attempt = 0.0
+        self._load()
+
+    def _load(self):
+        """Load the saved index if it exists and is fresh"""
+        if self.path is None:
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('season') != self.season or time.time() - data.get('built_at', 0) > self.max_age:
+            return
+
+        # JSON object keys are strings
+        self.positions = {int(player_id): position for player_id, position in data['positions'].items()}
+        self.built_at = data['built_at']
+
+    def _save(self):
+        """Write the index (caller holds the lock)"""
+        self._dirty = False
+        self._last_save = time.time()
+        if self.path is None:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Per-process temp file: batch_scan workers share the index path
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'season': self.season, 'built_at': self.built_at, 'positions': self.positions}, f)
+        os.replace(tmp_path, self.path)
+
+    def flush(self):
+        """Save positions learned from misses since the last save"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def is_fresh(self):
+        return bool(self.positions) and time.time() - self.built_at <= self.max_age
+
+    def build(self, fetcher, parser):
+        """Rebuild from the league player index, falling back to team rosters"""
+        positions = {}
+
+        response = fetcher.get_player_index(self.season)
+        if response:
+            positions = parser.parse_player_positions(response, id_key='PERSON_ID')
+
+        if not positions:
+            for team in fetcher.all_teams:
+                roster_response = fetcher.get_team_roster(team['id'], self.season)
+                if roster_response:
+                    positions.update(parser.parse_player_positions(roster_response))
+
+        if not positions:
+            return False
+
+        with self._lock:
+            self.positions.update(positions)
+            self.built_at = time.time()
+            self._save()
+
+        return True
+
+    def ensure_built(self, fetcher, parser, retry_after=600):
+        """Build the index if it is missing or stale (at most once per retry_after seconds)"""
+        with self._build_lock:
+            if self.is_fresh():
+                return True
+            if time.time() - self._last_build_attempt < retry_after:
+                return False
+            self._last_build_attempt = time.time()
+            return self.build(fetcher, parser)
+
+    def lookup(self, player_id):
+        """Cached position or None, without any request"""
+        with self._lock:
+            position = self.positions.get(player_id)
+            if position is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return position
+
+    def get_position(self, fetcher, parser, player_id):
+        """Position from the index, fetching CommonPlayerInfo only on a miss"""
+        self.ensure_built(fetcher, parser)
+
+        position = self.lookup(player_id)
+        if position is not None:
+            return position
+
+        player_info_response = fetcher.get_player_info(player_id)
+        if not player_info_response:
+            return 'SG'
+
+        position = parser.parse_player_info(player_info_response)
+        # Many misses in one batch would otherwise each rewrite the whole file
+        with self._lock:
+            self.positions[player_id] = position
+            self._dirty = True
+            if time.time() - self._last_save >= self.save_interval:
+                self._save()
+
+        return position
@@ -0,0 +1,450 @@
+import argparse
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from data_fetcher import NBADataFetcher
+from main import analyze_player, analyze_slate, open_stores, prepare_slate
+from matchup_matrix import MatchupMatrix
+from parser import NBADataParser
+from predictor import ThreePointPredictor, load_confidence_params
+from response_cache import DEFAULT_CACHE_DIR, cache_dir_for
+from shooter_filter import ShooterFilter
+from simple_position_defense import SimplePositionDefense
+from top_k import TopK
+from ttl_cache import TTLCache
+
+DAYS_AHEAD = {'today': 0, 'tomorrow': 1}
+
+_MISSING = object()
+
+
+class RequestError(Exception):
+    """A client error answered with its status code and message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 makes bursts of concurrent clients wait on SYN retries
+    request_queue_size = 128
+
+
+def _to_json(value):
+    """json.dumps fallback: numpy scalars/arrays to Python values, anything else to str"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class PredictionService:
+    """
+    Long-running local HTTP/JSON API over one resident fetcher, parser,
+    predictor and set of defense models, so every question reuses warm
+    in-memory indexes, the matchup matrix and the response cache instead of
+    a cold main.py run
+    Answers are kept as encoded JSON in a TTL cache; concurrent requests for
+    the same answer wait for one computation and are then served from memory
+    """
+
+    def __init__(self, fetcher=None, predictor=None, host='127.0.0.1', port=8780, workers=4, ttl=300,
+                 incremental=False, use_defense_table=False, retry_after=60, cache_dir=DEFAULT_CACHE_DIR,
+                 use_cache=True, negative_ttl=30):
+        """
+        ttl: seconds a computed answer is served before it is recomputed
+        negative_ttl: seconds a 404 (unknown player/team, no prediction) is served before it is retried
+        retry_after: seconds to wait before retrying a failed league data refresh
+        cache_dir / use_cache: where the response cache and stores persist (see main.open_stores)
+        """
+        cache, self.position_index, self.game_log_store, self.defense_table = open_stores(
+            cache_dir, use_cache, incremental, use_defense_table
+        )
+        self.fetcher = fetcher or NBADataFetcher(cache=cache, use_cache=use_cache)
+        self.parser = NBADataParser()
+        self.predictor = predictor or ThreePointPredictor()
+        self.pos_def = SimplePositionDefense()
+        self.shooter_filter = ShooterFilter()
+        self.matrix = MatchupMatrix()
+        self.workers = workers
+        self.retry_after = retry_after
+
+        self.answers = TTLCache(4096, ttl=ttl, name='service_answers')
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, requests using it]
+        self._refresh_lock = threading.Lock()
+        self._refresh_failed_at = 0.0
+        self.started_at = time.time()
+
+        self._httpd = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread; returns self"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def refresh(self):
+        """
+        Reload the league-wide data (game logs, positions, shooter filter, defense
+        table) and rebuild the matchup matrix once it is stale. The response cache
+        TTLs decide what is actually refetched. Returns True if the matrix is usable
+        """
+        with self._refresh_lock:
+            if self.matrix.is_fresh():
+                return True
+            if time.time() - self._refresh_failed_at < self.retry_after:
+                return False
+
+            prepare_slate(self.fetcher, self.parser, self.predictor, self.pos_def, self.workers,
+                          position_index=self.position_index, game_log_store=self.game_log_store,
+                          defense_table=self.defense_table, shooter_filter=self.shooter_filter)
+            # The matrix is past its TTL here, so this always rebuilds it from the reloaded data
+            if not self.matrix.ensure_built(self.fetcher, self.parser, self.predictor, self.pos_def,
+                                            self.position_index, workers=self.workers,
+                                            game_log_store=self.game_log_store,
+                                            defense_table=self.defense_table):
+                print("   Could not build the matchup matrix; answering per player")
+                self._refresh_failed_at = time.time()
+                return False
+            return True
+
+    @contextmanager
+    def _key_lock(self, key):
+        """Hold the lock for one answer key; it is dropped once no request uses it"""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def cached(self, key, compute):
+        """
+        (encoded JSON, True if served from memory) for an answer
+        compute() runs once per key while its answer is cached; a 404 it raises
+        is cached for negative_ttl seconds, other failures raise and are not cached
+        """
+        payload = self._cached_answer(key)
+        if payload is not _MISSING:
+            return payload, True
+
+        with self._key_lock(key):
+            # Another request may have computed it while we waited
+            payload = self._cached_answer(key)
+            if payload is not _MISSING:
+                return payload, True
+
+            try:
+                payload = json.dumps(compute(), default=_to_json).encode()
+            except RequestError as e:
+                if e.status == 404:
+                    self.answers.set(key, e, ttl=self.negative_ttl)
+                raise
+            self.answers.set(key, payload)
+            return payload, False
+
+    def _cached_answer(self, key):
+        """Encoded answer, _MISSING, or raises the cached 404"""
+        payload = self.answers.get(key, _MISSING)
+        if isinstance(payload, RequestError):
+            raise payload
+        return payload
+
+    def _lookup(self, key, find):
+        """find() once per key; a miss (404) is cached for negative_ttl seconds"""
+        error = self.answers.get(key)
+        if error is not None:
+            raise error
+        try:
+            return find()
+        except RequestError as e:
+            if e.status == 404:
+                self.answers.set(key, e, ttl=self.negative_ttl)
+            raise
+
+    def find_player(self, query):
+        """Player dict for a player_id or (fuzzy) name query"""
+        if not query:
+            raise RequestError(400, "Missing 'player' parameter")
+
+        def find():
+            if query.isdigit():
+                player = self.fetcher.find_player_by_id(int(query))
+            else:
+                player = self.fetcher.find_player_by_name(query)
+            if not player:
+                raise RequestError(404, f"Could not find player: {query}")
+            return player
+
+        return self._lookup(('unknown_player', query), find)
+
+    def find_team(self, abbrev):
+        if not abbrev:
+            raise RequestError(400, "Missing 'opponent' parameter")
+
+        def find():
+            team = self.fetcher.find_team_by_abbrev(abbrev.upper())
+            if not team:
+                raise RequestError(404, f"Could not find team: {abbrev}")
+            return team
+
+        return self._lookup(('unknown_team', abbrev.upper()), find)
+
+    def predict(self, query):
+        """/predict?player=<name or id>&opponent=<abbrev>: one player vs one team"""
+        player = self.find_player(query.get('player'))
+        opponent = self.find_team(query.get('opponent'))
+
+        def compute():
+            self.refresh()
+            result = analyze_player(
+                self.fetcher, self.parser, self.predictor, self.pos_def,
+                player['id'], player['full_name'],
+                opponent['id'], opponent['abbreviation'],
+                position_index=self.position_index,
+                matrix=self.matrix if self.matrix.is_fresh() else None,
+                game_log_store=self.game_log_store,
+                defense_table=self.defense_table
+            )
+            if not result:
+                # Below the 3PA filter, too few games, or a failed request
+                raise RequestError(404, f"Could not generate prediction for {player['full_name']}")
+            return {'player_id': player['id'], 'opponent': opponent['abbreviation'], **result}
+
+        return self.cached(('predict', player['id'], opponent['id']), compute)
+
+    def matchups(self, query):
+        """/matchups?player=<name or id>: the player's prediction against every opponent, best first"""
+        player = self.find_player(query.get('player'))
+
+        def compute():
+            if not self.refresh():
+                raise RequestError(503, "Matchup matrix is unavailable")
+            rows = self.matrix.player_row(player['id'])
+            if not rows:
+                raise RequestError(404, f"No matchups for {player['full_name']}")
+            return {
+                'player_id': player['id'],
+                'name': player['full_name'],
+                'matchups': [
+                    {'opponent': abbrev, 'prediction': prediction, 'confidence_score': score,
+                     'confidence_tier': tier}
+                    for abbrev, prediction, score, tier in rows
+                ]
+            }
+
+        return self.cached(('matchups', player['id']), compute)
+
+    def slate(self, query):
+        """/slate?day=today|tomorrow: every qualifying shooter on the slate plus the top HIGH picks"""
+        day = query.get('day', 'today').lower()
+        if day not in DAYS_AHEAD:
+            raise RequestError(400, f"Unknown day: {day} (use today or tomorrow)")
+
+        def compute():
+            self.refresh()
+            scoreboard = self.fetcher.get_todays_games(DAYS_AHEAD[day])
+            if not scoreboard:
+                raise RequestError(502, f"Could not fetch {day}'s games")
+            games = self.parser.parse_scoreboard(scoreboard)
+
+            # refresh() already ran prepare_slate; injuries are looked up per opponent
+            # through the injury client's snapshot, the matrix build keeps it warm
+            slate = analyze_slate(self.fetcher, self.parser, self.predictor, self.pos_def, games,
+                                  workers=self.workers, position_index=self.position_index,
+                                  matrix=self.matrix if self.matrix.is_fresh() else None,
+                                  game_log_store=self.game_log_store, defense_table=self.defense_table,
+                                  shooter_filter=self.shooter_filter)
+
+            picks = TopK(10, key=lambda pick: pick['confidence_score'])
+            matchups = []
+            for matchup in slate:
+                sides = []
+                for side in matchup['sides']:
+                    results = side['results'] or []
+                    sides.append({
+                        'team': side['team']['abbreviation'],
+                        'opponent': side['opponent']['abbreviation'],
+                        'results': results
+                    })
+                    for result in results:
+                        if result['confidence_tier'] == 'HIGH':
+                            picks.push(result)
+                matchups.append({
+                    'game_id': matchup['game']['game_id'],
+                    'status': matchup['game']['status'],
+                    'away': matchup['away_team']['abbreviation'],
+                    'home': matchup['home_team']['abbreviation'],
+                    'sides': sides
+                })
+
+            return {
+                'day': day,
+                'games': len(games),
+                'matchups': matchups,
+                'picks': [
+                    {'name': pick['name'], 'matchup': pick['matchup'], 'prediction': pick['prediction'],
+                     'confidence_score': pick['confidence_score'],
+                     'recent_avg': sum(pick['stats']['last_5_3pm']) / 5,
+                     'opp_3p_pct_allowed': pick['opponent_defense']['opp_3p_pct_allowed']}
+                    for pick in picks.items()
+                ]
+            }
+
+        return self.cached(('slate', day), compute)
+
+    def health(self, query):
+        """/health: uptime, matrix state and cache/limiter counters (never cached)"""
+        body = {
+            'status': 'ok',
+            'uptime': round(time.time() - self.started_at, 1),
+            'matrix_fresh': self.matrix.is_fresh(),
+            'answers': self.answers.stats(),
+            'injuries': self.fetcher.injury_client.stats(),
+            'shooter_filter': self.shooter_filter.summary(),
+            'limiters': [limiter.stats() for limiter in (self.fetcher.nba_limiter, self.fetcher.espn_limiter)]
+        }
+        return json.dumps(body, default=_to_json).encode(), False
+
+    def invalidate(self, query):
+        """POST /invalidate: drop every cached answer and force a refresh on the next request"""
+        self.answers.clear()
+        self.fetcher.injury_client.invalidate()
+        with self._refresh_lock:
+            self.matrix.invalidate()
+            self._refresh_failed_at = 0.0
+        return json.dumps({'status': 'ok'}).encode(), False
+
+    def route(self, method, path):
+        routes = {
+            ('GET', '/predict'): self.predict,
+            ('GET', '/matchups'): self.matchups,
+            ('GET', '/slate'): self.slate,
+            ('GET', '/health'): self.health,
+            ('POST', '/invalidate'): self.invalidate,
+        }
+        return routes.get((method, path.rstrip('/')))
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.serve('GET')
+
+            def do_POST(self):
+                self.serve('POST')
+
+            def serve(self, method):
+                parsed = urlparse(self.path)
+                query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+
+                handler = service.route(method, parsed.path)
+                hit = False
+                try:
+                    if handler is None:
+                        raise RequestError(404, f"Unknown path {method} {parsed.path}")
+                    payload, hit = handler(query)
+                    status = 200
+                except RequestError as e:
+                    status, payload = e.status, json.dumps({'error': str(e)}).encode()
+                except Exception as e:
+                    print(f"    Error serving {self.path}: {e}")
+                    status, payload = 500, json.dumps({'error': str(e)}).encode()
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('X-Cache', 'hit' if hit else 'miss')
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass  # clients poll; one line per request would swamp the console
+
+        return Handler
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Local HTTP/JSON prediction service with warm caches")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8780)
+    arg_parser.add_argument('--workers', type=int, default=4, help="threads used per slate scan (default: 4)")
+    arg_parser.add_argument('--ttl', type=float, default=300, help="seconds a computed answer is served from memory")
+    arg_parser.add_argument('--no-warm', action='store_true',
+                            help="start serving immediately instead of building the matchup matrix first")
+    arg_parser.add_argument('--incremental', action='store_true',
+                            help="keep game logs on disk and fetch only games played since the last run")
+    arg_parser.add_argument('--defense-table', action='store_true',
+                            help="use measured position splits from the persisted position defense table")
+    arg_parser.add_argument('--nba-rate', type=float, default=None,
+                            help="max stats.nba.com requests per second, shared by all threads")
+    arg_parser.add_argument('--espn-rate', type=float, default=None,
+                            help="max ESPN requests per second, shared by all threads")
+    arg_parser.add_argument('--api-base-url', metavar='URL', default=None,
+                            help="send stats.nba.com and ESPN requests to URL (e.g. the local stand_in_server.py)")
+    arg_parser.add_argument('--no-cache', action='store_true', help="don't read or write the response cache")
+    arg_parser.add_argument('--confidence-config', metavar='PATH', default=None,
+                            help="confidence weights/thresholds JSON (e.g. from confidence_sweep.py)")
+    return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    NBADataFetcher.configure_rate_limits(nba_rate=args.nba_rate, espn_rate=args.espn_rate)
+    NBADataFetcher.configure_endpoints(nba_base_url=args.api_base_url, espn_base_url=args.api_base_url)
+
+    service = PredictionService(
+        predictor=ThreePointPredictor(
+            load_confidence_params(args.confidence_config) if args.confidence_config else None
+        ),
+        host=args.host, port=args.port, workers=max(1, args.workers), ttl=args.ttl,
+        incremental=args.incremental, use_defense_table=args.defense_table,
+        cache_dir=cache_dir_for(args.api_base_url), use_cache=not args.no_cache
+    )
+
+    if not args.no_warm:
+        print("Warming league data and the matchup matrix...")
+        service.refresh()
+
+    print(f"Serving predictions at {service.url}")
+    print(f"  {service.url}/predict?player=Stephen+Curry&opponent=LAL")
+    print(f"  {service.url}/matchups?player=Stephen+Curry")
+    print(f"  {service.url}/slate?day=today")
+    print(f"  {service.url}/health")
+    try:
+        service._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service._httpd.server_close()
@@ -1,7 +1,52 @@
-import numpy as np
+import json
+
+from player_search import fold_name
+
+# Column order of the opponent defense vectors used by the batch API
+POSITION_GROUPS = ('guard', 'forward', 'center')
+
+# calculate_confidence weights and cutoffs; confidence_sweep.py exports tuned sets
+DEFAULT_CONFIDENCE_PARAMS = {
+    'recent_weight': 35,               # last-5 3PM average, full weight at 5 per game
+    'matchup_weight': 30,              # cap on the above-league-average defense bonus
+    'volume_cutoffs': [6, 4, 2],       # 3PA per game
+    'volume_points': [15, 10, 5],
+    'variance_cutoffs': [1.5, 2.5],    # std of the last 10 games' 3PM
+    'consistency_points': [10, 5],
+    'injury_points': 10,               # per perimeter defender OUT
+    'tier_thresholds': [70, 50],       # HIGH, MEDIUM
+}
+
+
+def load_confidence_params(path):
+    """Confidence params from a JSON file, defaults for anything it leaves out"""
+    with open(path) as f:
+        loaded = json.load(f)
+
+    unknown = sorted(set(loaded) - set(DEFAULT_CONFIDENCE_PARAMS))
+    if unknown:
+        print(f"    Ignoring unknown confidence params: {', '.join(unknown)}")
+    return {key: loaded.get(key, default) for key, default in DEFAULT_CONFIDENCE_PARAMS.items()}
+
+
+# Suffixes ESPN and the defender lists don't always agree on
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+# Folded names ESPN uses -> folded names in perimeter_defenders
+NAME_ALIASES = {
+    'lu dort': 'luguentz dort',
+}
+
+
+def defender_key(name):
+    """Comparable defender name: "P.J. Washington" and "PJ Washington" -> "pj washington" """
+    key = ' '.join(word for word in fold_name(name).split() if word not in NAME_SUFFIXES)
+    return NAME_ALIASES.get(key, key)
+
 
 class ThreePointPredictor:
-    def __init__(self):
+    def __init__(self, confidence_params=None):
+        self.confidence_params = {**DEFAULT_CONFIDENCE_PARAMS, **(confidence_params or {})}
         self.league_avg_3p_pct = 0.365 # range of 0.360 - 0.365, will just use max here for testing purposes
 
         self.perimeter_defenders = {
@@ -17,7 +62,7 @@ class ThreePointPredictor:
             'CLE': ['De\'Andre Hunter', 'Evan Mobley', 'Lonzo Ball'],
             'BKN': ['Nic Claxton'],
             'CHA': [], # they really don't have anyone considered a "good" perimeter defender aside from like josh green lol
-            'CHI': ['Issac Okoro'],
+            'CHI': ['Isaac Okoro'],
             'DAL': ['P.J. Washington', 'Cooper Flagg', 'Anthony Davis', 'Max Christie'],
             'DEN': ['Aaron Gordon'],
             'DET': ['Ausar Thompson'],
@@ -27,7 +72,7 @@ class ThreePointPredictor:
             'MIL': ['Giannis Antetokounmpo', 'Gary Harris'],
             'NOP': ['Herbert Jones', 'Jose Alvarado'],
             'NYK': ['OG Anunoby', 'Mikal Bridges', 'Josh Hart', 'Miles McBride'],
-            'ORL': ['Jalen Suggs', 'Anthony Black', 'Jonathan Issac'],
+            'ORL': ['Jalen Suggs', 'Anthony Black', 'Jonathan Isaac'],
             'PHX': ['Dillon Brooks', 'Royce O\'Neale', 'Ryan Dunn'],
             'POR': ['Toumani Camara', 'Jrue Holiday'],
             'SAC': ['Keon Ellis'],
@@ -36,6 +81,7 @@ class ThreePointPredictor:
             'UTA': [], # they suck perimeter-y too
             'WAS': ['Bilal Coulibaly']
         }
+        self.compile_defenders()
 
     def get_position_group(self, position):
         """Convert NBA position to defensive grouping"""
@@ -52,6 +98,7 @@ class ThreePointPredictor:
         opponent_stats: dict with position-specific defense
         position: player's position (PG, SG, SF, PF, C)
         """
+        import numpy as np
 
         # Base prediction on recent average
         last_10_avg = np.mean(player_stats['last_10_3pm'])
@@ -73,31 +120,61 @@ class ThreePointPredictor:
 
         return round(prediction, 1)
 
-    def adjust_for_injuries(self, prediction, injuries, opponent_team_abbrev):
-        """Adjust prediction if key defenders are out"""
+    def compile_defenders(self):
+        """Normalized perimeter defender sets per team; rebuild after editing perimeter_defenders"""
+        self.defender_keys = {
+            team: {defender_key(name) for name in names} for team, names in self.perimeter_defenders.items()
+        }
+
+    def injury_impact(self, injuries, team_abbrev):
+        """
+        What a team's injury report means for shooters facing it, computed once per team:
+        out_defenders (ESPN display names), prediction boost and confidence bonus
+        """
+        defenders = self.defender_keys.get(team_abbrev, ())
+        out_defenders = []
         boost = 0
-        injured_defenders = []
 
         for injury in injuries:
             if injury.get('status') == 'OUT':
                 player_name = injury.get('athlete', {}).get('displayName', '')
+                if defender_key(player_name) in defenders:
+                    boost += 0.3
+                    out_defenders.append(player_name)
 
-                # Check if this is an elite defender
-                if opponent_team_abbrev in self.perimeter_defenders:
-                    if player_name in self.perimeter_defenders[opponent_team_abbrev]:
-                        boost += 0.3
-                        injured_defenders.append(player_name)
+        return {
+            'out_defenders': out_defenders,
+            'boost': boost,
+            'confidence_bonus': len(out_defenders) * self.confidence_params['injury_points']
+        }
 
-        return prediction + boost, injured_defenders
+    def build_injury_index(self, injuries_by_team):
+        """{team_abbrev: injury_impact} for a slate, from {team_abbrev: parsed injury list}"""
+        return {team: self.injury_impact(injuries, team) for team, injuries in injuries_by_team.items()}
 
-    def calculate_confidence(self, player_stats, opponent_stats, position, injuries, opponent_team_abbrev):
-        """Returns confidence score 0-100 and list of factor flags"""
+    def adjust_for_injuries(self, prediction, injuries, opponent_team_abbrev, impact=None):
+        """
+        Adjust prediction if key defenders are out
+        impact: the opponent's precomputed injury_impact (injuries is then not read)
+        """
+        if impact is None:
+            impact = self.injury_impact(injuries, opponent_team_abbrev)
+        return prediction + impact['boost'], list(impact['out_defenders'])
+
+    def calculate_confidence(self, player_stats, opponent_stats, position, injuries, opponent_team_abbrev,
+                             impact=None):
+        """
+        Returns confidence score 0-100 and list of factor flags
+        impact: the opponent's precomputed injury_impact (injuries is then not read)
+        """
+        import numpy as np
+        params = self.confidence_params
         score = 0
         flags = []
 
         # Recent performance (35%)
         last_5_avg = np.mean(player_stats['last_5_3pm'])
-        recent_score = min((last_5_avg / 5) * 35, 35)
+        recent_score = min((last_5_avg / 5) * params['recent_weight'], params['recent_weight'])
         score += recent_score
 
         if last_5_avg >= 3:
@@ -113,8 +190,9 @@ class ThreePointPredictor:
             opp_3p_allowed = opponent_stats.get('opp_3p_pct_allowed', self.league_avg_3p_pct)
 
         if opp_3p_allowed > self.league_avg_3p_pct:
-            matchup_bonus = ((opp_3p_allowed - self.league_avg_3p_pct) / self.league_avg_3p_pct) * 30
-            score += min(matchup_bonus, 30)
+            matchup_weight = params['matchup_weight']
+            matchup_bonus = ((opp_3p_allowed - self.league_avg_3p_pct) / self.league_avg_3p_pct) * matchup_weight
+            score += min(matchup_bonus, matchup_weight)
             flags.append(
                 f"✓ Opponent allows {opp_3p_allowed:.1%} to {position_group}s (league avg: {self.league_avg_3p_pct:.1%})")
         else:
@@ -122,46 +200,174 @@ class ThreePointPredictor:
 
         # Volume (15%)
         attempts = player_stats['3pa_per_game']
-        if attempts >= 6:
-            score += 15
+        high_volume, moderate_volume, low_volume = params['volume_cutoffs']
+        if attempts >= high_volume:
+            score += params['volume_points'][0]
             flags.append(f"High volume shooter ({attempts:.1f} 3PA/game)")
-        elif attempts >= 4:
-            score += 10
+        elif attempts >= moderate_volume:
+            score += params['volume_points'][1]
             flags.append(f"Moderate volume ({attempts:.1f} 3PA/game)")
-        elif attempts >= 2:
-            score += 5
+        elif attempts >= low_volume:
+            score += params['volume_points'][2]
         else:
             flags.append(f"Low volume shooter ({attempts:.1f} 3PA/game)")
 
         # Consistency (10%)
         variance = np.std(player_stats['last_10_3pm'])
-        if variance < 1.5:
-            score += 10
+        consistent, inconsistent = params['variance_cutoffs']
+        if variance < consistent:
+            score += params['consistency_points'][0]
             flags.append(f"Consistent shooter (variance: {variance:.1f})")
-        elif variance < 2.5:
-            score += 5
+        elif variance < inconsistent:
+            score += params['consistency_points'][1]
         else:
             flags.append(f"Inconsistent (variance: {variance:.1f})")
 
         # Injury adjustment (10%)
-        injured_defenders = []
-        for injury in injuries:
-            if injury.get('status') == 'OUT':
-                player_name = injury.get('athlete', {}).get('displayName', '')
-                if opponent_team_abbrev in self.perimeter_defenders:
-                    if player_name in self.perimeter_defenders[opponent_team_abbrev]:
-                        score += 10
-                        injured_defenders.append(player_name)
+        if impact is None:
+            impact = self.injury_impact(injuries, opponent_team_abbrev)
+        score += impact['confidence_bonus']
 
-        if injured_defenders:
-            flags.append(f"Key defender(s) OUT: {', '.join(injured_defenders)}")
+        if impact['out_defenders']:
+            flags.append(f"Key defender(s) OUT: {', '.join(impact['out_defenders'])}")
 
         return min(int(score), 100), flags
 
     def get_confidence_tier(self, score):
-        if score >= 70:
+        high, medium = self.confidence_params['tier_thresholds']
+        if score >= high:
             return "HIGH"
-        elif score >= 50:
+        elif score >= medium:
             return "MEDIUM"
         else:
-            return "LOW"
\ No newline at end of file
+            return "LOW"
+
+    def defense_vector(self, opponent_stats):
+        """Opponent stats dict -> [guard, forward, center] 3P% allowed, same fallback as the scalar methods"""
+        overall = opponent_stats.get('opp_3p_pct_allowed', self.league_avg_3p_pct)
+        return [opponent_stats.get(f'{group}_3p_pct_allowed', overall) for group in POSITION_GROUPS]
+
+    def _pad_windows(self, recent_3pm, width=10):
+        """Ragged most-recent-first 3PM windows -> (N, width) float array padded with NaN"""
+        import numpy as np
+        if isinstance(recent_3pm, np.ndarray) and recent_3pm.ndim == 2:
+            return recent_3pm.astype(float)
+
+        windows = np.full((len(recent_3pm), width), np.nan)
+        for i, games in enumerate(recent_3pm):
+            games = list(games)[:width]
+            windows[i, :len(games)] = games
+        return windows
+
+    def confidence_features(self, recent_3pm, attempts, positions, opponent_defense):
+        """
+        Per-player inputs to the confidence score, independent of its weights:
+        last_10_avg, last_5_avg, variance, attempts and opp_3p_allowed arrays
+        Arguments as for predict_batch
+        """
+        import numpy as np
+        windows = self._pad_windows(recent_3pm)
+        n = windows.shape[0]
+        opponent_defense = np.asarray(opponent_defense, dtype=float).reshape(n, len(POSITION_GROUPS))
+
+        counts = np.sum(~np.isnan(windows), axis=1)
+        filled = np.nan_to_num(windows)
+
+        # 3PM counts are small integers, so these sums (and means) are exact
+        with np.errstate(invalid='ignore', divide='ignore'):
+            last_10_avg = filled.sum(axis=1) / counts
+        last_5_avg = filled[:, :5].sum(axis=1) / 5
+
+        # np.std per window length keeps the reduction order of the scalar path
+        variance = np.zeros(n)
+        for length in np.unique(counts):
+            rows = counts == length
+            if length > 0:
+                variance[rows] = np.std(windows[rows, :length], axis=1)
+
+        group_of = {p: POSITION_GROUPS.index(self.get_position_group(p)) for p in set(positions)}
+        group_idx = np.array([group_of[p] for p in positions], dtype=int)
+
+        return {
+            'last_10_avg': last_10_avg,
+            'last_5_avg': last_5_avg,
+            'variance': variance,
+            'attempts': np.asarray(attempts, dtype=float),
+            'opp_3p_allowed': opponent_defense[np.arange(n), group_idx],
+        }
+
+    def score_confidence(self, features, injured_defenders_out, params=None):
+        """
+        Vectorized calculate_confidence score from confidence_features
+        params: defaults to self.confidence_params; values may also be (C, 1)
+                arrays to score C parameter sets at once, giving (C, N) scores
+        """
+        import numpy as np
+        params = params or self.confidence_params
+        last_5_avg = features['last_5_avg']
+        opp_3p_allowed = features['opp_3p_allowed']
+        attempts = features['attempts']
+        variance = features['variance']
+
+        # Term by term in the scalar order
+        recent_weight = params['recent_weight']
+        score = np.minimum((last_5_avg / 5) * recent_weight, recent_weight)
+
+        matchup_weight = params['matchup_weight']
+        matchup_bonus = ((opp_3p_allowed - self.league_avg_3p_pct) / self.league_avg_3p_pct) * matchup_weight
+        score = np.where(opp_3p_allowed > self.league_avg_3p_pct,
+                         score + np.minimum(matchup_bonus, matchup_weight), score)
+
+        score = score + np.select([attempts >= cutoff for cutoff in params['volume_cutoffs']],
+                                  params['volume_points'], 0)
+        score = score + np.select([variance < cutoff for cutoff in params['variance_cutoffs']],
+                                  params['consistency_points'], 0)
+
+        # Same bonus as injury_impact's confidence_bonus
+        score = score + np.asarray(injured_defenders_out, dtype=int) * params['injury_points']
+
+        return np.minimum(np.trunc(score).astype(int), 100)
+
+    def predict_batch(self, recent_3pm, attempts, positions, opponent_defense, injured_defenders_out=None):
+        """
+        Vectorized calculate_prediction + adjust_for_injuries + calculate_confidence for N players
+        recent_3pm: last_10_3pm windows (most recent first, 5-10 games each),
+                    as a list of lists or an (N, 10) NaN-padded array
+        attempts: 3PA per game ('3pa_per_game'), shape (N,)
+        positions: player positions (PG, SG, SF, PF, C), shape (N,)
+        opponent_defense: (N, 3) 3P% allowed to guards/forwards/centers (see defense_vector)
+        injured_defenders_out: OUT perimeter defenders on each opponent, shape (N,)
+        Returns: dict of arrays matching the scalar methods exactly:
+                 base_prediction, prediction, confidence_score, confidence_tier
+        """
+        import numpy as np
+        windows = self._pad_windows(recent_3pm)
+        n = windows.shape[0]
+        if injured_defenders_out is None:
+            injured_defenders_out = np.zeros(n, dtype=int)
+        injured_defenders_out = np.asarray(injured_defenders_out, dtype=int)
+
+        features = self.confidence_features(windows, attempts, positions, opponent_defense)
+        opp_3p_allowed = features['opp_3p_allowed']
+
+        # calculate_prediction / adjust_for_injuries
+        base_prediction = np.round(features['last_10_avg'] * (opp_3p_allowed / self.league_avg_3p_pct), 1)
+
+        max_out = int(injured_defenders_out.max()) if n else 0
+        boosts = [0]
+        for _ in range(max_out):
+            boosts.append(boosts[-1] + 0.3)  # same float accumulation as the scalar loop
+        prediction = base_prediction + np.asarray(boosts, dtype=float)[injured_defenders_out]
+
+        confidence_score = self.score_confidence(features, injured_defenders_out)
+        high, medium = self.confidence_params['tier_thresholds']
+        confidence_tier = np.where(
+            confidence_score >= high, "HIGH", np.where(confidence_score >= medium, "MEDIUM", "LOW")
+        )
+
+        return {
+            'base_prediction': base_prediction,
+            'prediction': prediction,
+            'confidence_score': confidence_score,
+            'confidence_tier': confidence_tier,
+        }
@@ -0,0 +1,134 @@
+import threading
+import time
+
+
+class ThrottledError(Exception):
+    """Raised when a service answers with HTTP 429 (too many requests)"""
+
+
+def is_retryable_error(exc):
+    """True for throttling responses and timeouts worth retrying after a backoff"""
+    if isinstance(exc, ThrottledError):
+        return True
+
+    response = getattr(exc, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+
+    import requests
+    return isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every caller of one service
+    Backs off exponentially on throttling/timeouts and halves its rate,
+    then creeps back up to the configured rate on successes
+    """
+
+    def __init__(self, name, rate, burst=1, max_retries=3, backoff_base=2.0, max_backoff=60.0):
+        self.name = name
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._backoff = 0.0
+        self.set_rate(rate, burst)
+
+        # Counters
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+        self.io_time = 0.0
+
+    def set_rate(self, rate, burst=None):
+        """Change the configured requests/second (and optionally the burst size)"""
+        with self._lock:
+            self.max_rate = float(rate)
+            self.rate = float(rate)
+            if burst is not None:
+                self.burst = max(1, int(burst))
+                self._tokens = min(self._tokens, self.burst)
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a token is available; returns seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Reserve the token now so the lock is not held while sleeping
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate, self._blocked_until - now)
+            self.wait_time += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        """Reset the backoff and recover the rate after a good response"""
+        with self._lock:
+            self._backoff = 0.0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+
+    def on_throttle(self):
+        """Block all callers for an exponentially growing delay and halve the rate"""
+        with self._lock:
+            self.throttled += 1
+            self._backoff = min(self.max_backoff, max(1.0, self._backoff * self.backoff_base))
+            self._blocked_until = max(self._blocked_until, time.monotonic() + self._backoff)
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def call(self, fetch):
+        """
+        Run fetch() under the limiter, retrying throttled/timed-out calls
+        Non-retryable exceptions (and the last retryable one) are re-raised
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            start = time.monotonic()
+            try:
+                result = fetch()
+            except Exception as e:
+                self._count_io(start)
+                if not is_retryable_error(e) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                self.on_throttle()
+                continue
+
+            self._count_io(start)
+            self.on_success()
+            return result
+
+    def _count_io(self, start):
+        with self._lock:
+            self.requests += 1
+            self.io_time += time.monotonic() - start
+
+    def stats(self):
+        """Snapshot of the counters"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'rate': round(self.rate, 3),
+                'max_rate': self.max_rate,
+                'requests': self.requests,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'wait_time': round(self.wait_time, 3),
+                'io_time': round(self.io_time, 3),
+            }
@@ -0,0 +1,170 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, 'responses.sqlite')
+
+# Responses and stores persisted while requests go to a stand-in server
+# (stand_in_server.py) must never feed real runs
+STAND_IN_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'stand_in')
+
+
+def cache_dir_for(api_base_url=None):
+    """Directory for the response cache and every persisted store"""
+    return STAND_IN_CACHE_DIR if api_base_url else DEFAULT_CACHE_DIR
+
+
+def seconds_until_rollover(now=None, rollover_hour=6):
+    """
+    Seconds until the next nightly rollover (default 6 AM local time)
+    By then every game of the previous night is final, so logs and
+    season-to-date numbers fetched before it are still current
+    """
+    now = now or datetime.now()
+    rollover = now.replace(hour=rollover_hour, minute=0, second=0, microsecond=0)
+    if rollover <= now:
+        rollover += timedelta(days=1)
+    return (rollover - now).total_seconds()
+
+
+# TTL per endpoint, either seconds or a callable returning seconds
+ENDPOINT_TTLS = {
+    'commonplayerinfo': 3 * 24 * 3600,  # positions rarely change
+    'playerindex': 3 * 24 * 3600,
+    'commonteamroster': 6 * 3600,
+    'playergamelog': seconds_until_rollover,  # valid until the next games finish
+    'playergamelogs': seconds_until_rollover,
+    'leaguedashplayerstats': seconds_until_rollover,
+    'teamdashboardbygeneralsplits': seconds_until_rollover,
+    'teamgamelog': seconds_until_rollover,
+    'leaguegamelog': seconds_until_rollover,
+    'boxscoretraditionalv2': 30 * 24 * 3600,  # only requested for finished games
+    'leaguedashptdefend': seconds_until_rollover,
+    'scoreboardv2': 10 * 60,
+    'espn_injuries': 0,  # InjuryClient keeps a snapshot and revalidates with ETags instead
+}
+
+DEFAULT_TTL = 3600
+
+
+class ResponseCache:
+    """Persistent SQLite cache of API responses keyed by endpoint and parameters"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None):
+        self.path = path
+        self.ttls = dict(ENDPOINT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # One connection shared by all threads, serialized by the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            # WAL lets batch_scan's worker processes read while another one writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'endpoint TEXT NOT NULL, '
+                'params TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, '
+                'body TEXT NOT NULL, '
+                'PRIMARY KEY (endpoint, params))'
+            )
+            # Last full response plus ETag/Last-Modified, for conditional requests
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS validated ('
+                'endpoint TEXT NOT NULL, '
+                'params TEXT NOT NULL, '
+                'validators TEXT NOT NULL, '
+                'body TEXT NOT NULL, '
+                'PRIMARY KEY (endpoint, params))'
+            )
+            self._conn.commit()
+
+    def make_key(self, params):
+        """Stable string key for a parameter dict"""
+        return json.dumps(params, sort_keys=True, default=str)
+
+    def get_ttl(self, endpoint):
+        """TTL in seconds for an endpoint"""
+        ttl = self.ttls.get(endpoint, DEFAULT_TTL)
+        return ttl() if callable(ttl) else ttl
+
+    def get(self, endpoint, params):
+        """Return the cached response, or None if missing or expired"""
+        key = self.make_key(params)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT expires_at, body FROM responses WHERE endpoint = ? AND params = ?',
+                (endpoint, key)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        expires_at, body = row
+        if expires_at < time.time():
+            return None
+
+        return json.loads(body)
+
+    def set(self, endpoint, params, response):
+        """Store a response with the endpoint's TTL"""
+        ttl = self.get_ttl(endpoint)
+        if ttl <= 0:
+            return
+
+        key = self.make_key(params)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (endpoint, params, expires_at, body) VALUES (?, ?, ?, ?)',
+                (endpoint, key, time.time() + ttl, json.dumps(response))
+            )
+            self._conn.commit()
+
+    def get_validated(self, endpoint, params):
+        """(validators, body) stored for revalidation, or (None, None); these never expire"""
+        key = self.make_key(params)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT validators, body FROM validated WHERE endpoint = ? AND params = ?',
+                (endpoint, key)
+            ).fetchone()
+
+        if row is None:
+            return None, None
+        return json.loads(row[0]), json.loads(row[1])
+
+    def set_validated(self, endpoint, params, validators, body):
+        """Store a response with its validators (e.g. {'etag': ..., 'last_modified': ...})"""
+        key = self.make_key(params)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO validated (endpoint, params, validators, body) VALUES (?, ?, ?, ?)',
+                (endpoint, key, json.dumps(validators), json.dumps(body))
+            )
+            self._conn.commit()
+
+    def clear(self, endpoint=None):
+        """Drop all cached responses, or only those of one endpoint"""
+        with self._lock:
+            for table in ('responses', 'validated'):
+                if endpoint is None:
+                    self._conn.execute(f'DELETE FROM {table}')
+                else:
+                    self._conn.execute(f'DELETE FROM {table} WHERE endpoint = ?', (endpoint,))
+            self._conn.commit()
+
+    def purge_expired(self):
+        """Delete expired rows to keep the file small"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+            self._conn.commit()
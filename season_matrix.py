@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+from datetime import date, datetime
+
+import numpy as np
+
+from response_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_MATRIX_DIR = os.path.join(DEFAULT_CACHE_DIR, 'season_matrix')
+
+# One (players, games) .npy file per column, oldest game first
+COLUMNS = {
+    'fg3m': np.int16,
+    'fg3a': np.int16,
+    'minutes': np.float32,
+    'date_ordinal': np.int32,
+}
+
+
+class SeasonStatsMatrix:
+    """
+    Dense player x game-number arrays of FG3M/FG3A/minutes/date ordinals
+    Opened with np.load(mmap_mode='r'), so any process can share the same
+    file zero-copy and slice windows for the whole league at once
+    """
+
+    def __init__(self, path, arrays, games_played, player_ids, season):
+        self.path = path
+        self.season = season
+        self.fg3m = arrays['fg3m']
+        self.fg3a = arrays['fg3a']
+        self.minutes = arrays['minutes']
+        self.date_ordinal = arrays['date_ordinal']
+        self.games_played = games_played
+        self.player_ids = player_ids
+        self.rows = {player_id: row for row, player_id in enumerate(player_ids)}
+
+    @classmethod
+    def write(cls, games, season="2025-26", path=DEFAULT_MATRIX_DIR):
+        """
+        games: iterable of (player_id, 'YYYY-MM-DD', fg3m, fg3a, minutes)
+        Writes the column files plus index.json and returns the opened matrix
+        """
+        by_player = {}
+        for player_id, game_date, fg3m, fg3a, minutes in games:
+            by_player.setdefault(player_id, []).append((game_date, fg3m or 0, fg3a or 0, minutes or 0))
+
+        player_ids = sorted(by_player)
+        max_games = max((len(g) for g in by_player.values()), default=0)
+
+        arrays = {name: np.zeros((len(player_ids), max_games), dtype=dtype) for name, dtype in COLUMNS.items()}
+        games_played = np.zeros(len(player_ids), dtype=np.int32)
+
+        for row, player_id in enumerate(player_ids):
+            player_games = sorted(by_player[player_id], key=lambda g: g[0])
+            games_played[row] = len(player_games)
+            for col, (game_date, fg3m, fg3a, minutes) in enumerate(player_games):
+                arrays['fg3m'][row, col] = fg3m
+                arrays['fg3a'][row, col] = fg3a
+                arrays['minutes'][row, col] = minutes
+                arrays['date_ordinal'][row, col] = date.fromisoformat(game_date[:10]).toordinal()
+
+        # Write into a temp dir and swap it in, so readers never see a half-written matrix
+        tmp_path = path + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f'{name}.npy'), array)
+        np.save(os.path.join(tmp_path, 'games_played.npy'), games_played)
+        with open(os.path.join(tmp_path, 'index.json'), 'w') as f:
+            json.dump({'season': season, 'player_ids': player_ids}, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return cls.open(path)
+
+    @classmethod
+    def from_game_log_store(cls, store, path=DEFAULT_MATRIX_DIR):
+        """Materialize a GameLogStore's season into a matrix"""
+        return cls.write(store.all_games(), store.season, path)
+
+    @classmethod
+    def from_league_game_logs(cls, response_dict, season="2025-26", path=DEFAULT_MATRIX_DIR):
+        """Materialize a PlayerGameLogs response into a matrix"""
+        result_set = response_dict['resultSets'][0]
+        headers = result_set['headers']
+        idx = {name: headers.index(name) for name in ('PLAYER_ID', 'GAME_DATE', 'FG3M', 'FG3A', 'MIN')}
+
+        games = (
+            (row[idx['PLAYER_ID']], row[idx['GAME_DATE']][:10], row[idx['FG3M']], row[idx['FG3A']], row[idx['MIN']])
+            for row in result_set['rowSet']
+        )
+        return cls.write(games, season, path)
+
+    @classmethod
+    def open(cls, path=DEFAULT_MATRIX_DIR):
+        """Memory-map an existing matrix (read-only, zero-copy)"""
+        with open(os.path.join(path, 'index.json')) as f:
+            index = json.load(f)
+
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in COLUMNS}
+        games_played = np.load(os.path.join(path, 'games_played.npy'), mmap_mode='r')
+        return cls(path, arrays, games_played, index['player_ids'], index['season'])
+
+    def window(self, column, n, player_ids=None):
+        """
+        Last n games of a column for many players, most recent first
+        Returns: (len(players), n) float array padded with NaN for short logs
+        """
+        rows = self._rows(player_ids)
+        values = getattr(self, column)
+        counts = np.asarray(self.games_played)[rows]
+
+        # Column of the k-th most recent game is count - 1 - k
+        cols = counts[:, None] - 1 - np.arange(n)[None, :]
+        valid = cols >= 0
+        gathered = np.asarray(values[rows[:, None], np.clip(cols, 0, None)], dtype=float)
+        return np.where(valid, gathered, np.nan)
+
+    def batch_inputs(self, player_ids=None, min_games=5):
+        """
+        predict_batch inputs for players with at least min_games:
+        (player_ids, last-10 3PM windows, season 3PA per game)
+        """
+        rows = self._rows(player_ids)
+        counts = np.asarray(self.games_played)[rows]
+        keep = rows[counts >= min_games]
+        ids = [self.player_ids[row] for row in keep]
+
+        windows = self.window('fg3m', 10, ids)
+        total_3pa = np.asarray(self.fg3a[keep], dtype=np.int64).sum(axis=1)
+        attempts = np.round(total_3pa / np.asarray(self.games_played)[keep], 1)
+        return ids, windows, attempts
+
+    def player_stats(self, player_id, use_season_avg=True):
+        """parse_player_game_log-equivalent stats for one player, or None"""
+        row = self.rows.get(player_id)
+        if row is None or self.games_played[row] < 5:
+            return None
+
+        count = int(self.games_played[row])
+        fg3m = [int(x) for x in self.fg3m[row, :count][::-1]]
+        fg3a = [int(x) for x in self.fg3a[row, :count][::-1]]
+        recent_ordinals = self.date_ordinal[row, max(0, count - 10):count][::-1]
+        dates = [date.fromordinal(int(d)).strftime('%-m/%-d/%Y') for d in recent_ordinals]
+
+        last_10_3pa = fg3a[:10]
+        season_avg = np.float64(sum(fg3a) / count)
+        last_10_avg = np.float64(sum(last_10_3pa) / len(last_10_3pa))
+
+        return {
+            'last_5_3pm': fg3m[:5],
+            'last_10_3pm': fg3m[:10],
+            'last_5_dates': dates[:5],
+            'last_10_dates': dates,
+            'last_10_3pa': last_10_3pa,
+            '3pa_per_game': round(season_avg if use_season_avg else last_10_avg, 1),
+            'season_3pa_avg': round(season_avg, 1),
+            'last_10_3pa_avg': round(last_10_avg, 1),
+            'games_played': count
+        }
+
+    def _rows(self, player_ids):
+        if player_ids is None:
+            return np.arange(len(self.player_ids))
+        return np.array([self.rows[player_id] for player_id in player_ids], dtype=int)
+
+
+if __name__ == "__main__":
+    from data_fetcher import NBADataFetcher
+
+    started = datetime.now()
+    response = NBADataFetcher().get_league_game_logs()
+    if not response:
+        print("Could not fetch league game logs.")
+    else:
+        matrix = SeasonStatsMatrix.from_league_game_logs(response)
+        print(f"Wrote {len(matrix.player_ids)} players x {matrix.fg3m.shape[1]} games to {matrix.path} "
+              f"in {(datetime.now() - started).total_seconds():.1f}s")
@@ -0,0 +1,80 @@
+import threading
+import time
+
+
+class ShooterFilter:
+    """
+    Season 3PA per game for every player from one LeagueDashPlayerStats call,
+    used to pick each roster's qualifying 3PT shooters before any per-player
+    request. Replaces taking the first 10 roster spots, which spent requests
+    on bench non-shooters and could cut off real shooters
+    """
+
+    def __init__(self, season="2025-26", min_3pa=3.0, min_games=5, tolerance=0.1, max_age=3600):
+        """
+        min_3pa / min_games: analyze_player's own volume and sample filters
+        tolerance: 3PA slack, so a player whose game log has a game the
+                   league stats don't yet is not dropped at the boundary
+        """
+        self.season = season
+        self.min_3pa = min_3pa
+        self.min_games = min_games
+        self.tolerance = tolerance
+        self.max_age = max_age
+
+        self.stats = {}  # player_id -> {'team_id', 'gp', 'fg3m', 'fg3a'} season totals
+        self.built_at = 0.0
+        self.selected = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def is_fresh(self):
+        return bool(self.stats) and time.time() - self.built_at <= self.max_age
+
+    def ensure_built(self, fetcher, parser):
+        """Load the league-wide totals if missing or stale; True if available"""
+        with self._lock:
+            if self.is_fresh():
+                return True
+
+            response = fetcher.get_league_player_stats(self.season)
+            stats = parser.parse_league_player_stats(response) if response else {}
+            if not stats:
+                print("   Could not load league shooting stats, analyzing the first 10 roster players")
+                return bool(self.stats)
+
+            self.stats = stats
+            self.built_at = time.time()
+            return True
+
+    def attempts_per_game(self, player_id):
+        """Season 3PA per game (rounded like the game log parser), or None if unknown"""
+        player = self.stats.get(player_id)
+        if not player or not player['gp']:
+            return None
+        return round(player['fg3a'] / player['gp'], 1)
+
+    def qualifies(self, player_id):
+        player = self.stats.get(player_id)
+        if not player or player['gp'] < self.min_games:
+            return False
+        return self.attempts_per_game(player_id) >= self.min_3pa - self.tolerance
+
+    def select(self, player_ids):
+        """
+        Roster player_ids worth analyzing, in roster order
+        Falls back to the first 10 when the league stats could not be loaded
+        """
+        if self.stats:
+            selected = [player_id for player_id in player_ids if self.qualifies(player_id)]
+        else:
+            selected = list(player_ids[:10])
+
+        with self._lock:
+            self.selected += len(selected)
+            self.skipped += len(player_ids) - len(selected)
+        return selected
+
+    def summary(self):
+        with self._lock:
+            return {'players': len(self.stats), 'selected': self.selected, 'skipped': self.skipped}
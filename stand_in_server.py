@@ -0,0 +1,271 @@
+import argparse
+import hashlib
+import importlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmark import ANY_PARAMS, fixture_key, load_fixtures, make_synthetic_fixtures
+
+ESPN_INJURIES_PATH = re.compile(r'^/apis/site/v2/sports/basketball/nba/teams/([^/]+)/injuries$')
+
+
+def _date_from(query):
+    return {'date_from': query['DateFrom']} if query.get('DateFrom') else {}
+
+
+# stats.nba.com endpoint -> fixture params (as NBADataFetcher keys them) from the query string
+STATS_PARAMS = {
+    'playergamelog': lambda q: {'player_id': int(q['PlayerID']), 'season': q['Season'], **_date_from(q)},
+    'playergamelogs': lambda q: {'season': q['Season'], **_date_from(q)},
+    'commonplayerinfo': lambda q: {'player_id': int(q['PlayerID'])},
+    'playerindex': lambda q: {'season': q['Season']},
+    'leaguedashplayerstats': lambda q: {'season': q['Season']},
+    'teamdashboardbygeneralsplits': lambda q: {'team_id': int(q['TeamID']), 'season': q['Season'],
+                                               'measure_type': q['MeasureType']},
+    'leaguedashptdefend': lambda q: {'season': q['Season'], 'defense_category': q['DefenseCategory']},
+    'commonteamroster': lambda q: {'team_id': int(q['TeamID']), 'season': q['Season']},
+    'teamgamelog': lambda q: {'team_id': int(q['TeamID']), 'season': q['Season']},
+    'leaguegamelog': lambda q: {'season': q['Season'], 'player_or_team': q['PlayerOrTeam']},
+    'boxscoretraditionalv2': lambda q: {'game_id': q['GameID']},
+    'scoreboardv2': lambda q: {'game_date': q['GameDate']},
+}
+
+
+_expected_data_sets = {}
+
+
+def _expected_data_sets_for(endpoint):
+    """{data set name: headers} nba_api's endpoint class loads for an endpoint"""
+    if endpoint not in _expected_data_sets:
+        expected = {}
+        try:
+            module = importlib.import_module(f'nba_api.stats.endpoints.{endpoint}')
+            for value in vars(module).values():
+                if isinstance(value, type) and getattr(value, 'endpoint', None) == endpoint:
+                    expected = getattr(value, 'expected_data', {})
+                    break
+        except ImportError:
+            pass
+        _expected_data_sets[endpoint] = expected
+    return _expected_data_sets[endpoint]
+
+
+def complete_result_sets(endpoint, body):
+    """
+    Append empty result sets nba_api expects but the fixture lacks
+    (e.g. ScoreboardV2's 'Available'), so trimmed fixtures still load
+    """
+    expected = _expected_data_sets_for(endpoint)
+    if not expected or 'resultSets' not in body:
+        return body
+
+    present = {result_set.get('name') for result_set in body['resultSets']}
+    missing = [
+        {'name': name, 'headers': headers, 'rowSet': []}
+        for name, headers in expected.items() if name not in present
+    ]
+    if not missing:
+        return body
+    return dict(body, resultSets=body['resultSets'] + missing)
+
+
+class StandInServer:
+    """
+    Local HTTP stand-in for stats.nba.com and the ESPN injuries API,
+    serving recorded/synthetic fixtures (benchmark.py format) with
+    configurable latency, jitter, random 429s and 500s, and an optional
+    requests/second limit above which it answers 429 like the real API
+    Injury reports carry ETags and honor If-None-Match with 304s
+    """
+
+    def __init__(self, fixtures, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 throttle_rate=0.0, failure_rate=0.0, rate_limit=None, seed=0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit  # requests/second, None for unlimited
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = []  # request timestamps within the last second
+        self.counts = {}  # (endpoint, status) -> count
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread; returns self"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        with self._lock:
+            by_endpoint = {}
+            for (endpoint, status), count in self.counts.items():
+                by_endpoint.setdefault(endpoint, {})[str(status)] = count
+            return {
+                'requests': sum(self.counts.values()),
+                'throttled': sum(c for (_, status), c in self.counts.items() if status == 429),
+                'failed': sum(c for (_, status), c in self.counts.items() if status >= 500),
+                'by_endpoint': dict(sorted(by_endpoint.items()))
+            }
+
+    def resolve(self, path, query):
+        """(endpoint, fixture params) for a request path, or (None, None)"""
+        match = ESPN_INJURIES_PATH.match(path)
+        if match:
+            return 'espn_injuries', {'team': match.group(1).lower()}
+
+        if path.startswith('/stats/'):
+            endpoint = path[len('/stats/'):].strip('/').lower()
+            to_params = STATS_PARAMS.get(endpoint)
+            if to_params:
+                try:
+                    return endpoint, to_params(query)
+                except (KeyError, ValueError):
+                    return endpoint, None
+            return endpoint, None
+
+        return None, None
+
+    @staticmethod
+    def etag_for(body):
+        """Strong ETag for a JSON body, stable across runs"""
+        return '"' + hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16] + '"'
+
+    def respond(self, path, query, if_none_match=None):
+        """
+        (status, body) for a request, after latency and fault injection
+        if_none_match: the request's If-None-Match; injury reports answer 304 (body None) when it matches
+        """
+        endpoint, params = self.resolve(path, query)
+
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            roll = self._random.random()
+
+            now = time.monotonic()
+            self._recent = [t for t in self._recent if now - t < 1.0]
+            over_limit = self.rate_limit is not None and len(self._recent) >= self.rate_limit
+            self._recent.append(now)
+
+        if delay:
+            time.sleep(delay)
+
+        if over_limit or roll < self.throttle_rate:
+            # Like the real services, error bodies are not JSON
+            status, body = 429, 'Too Many Requests'
+        elif roll < self.throttle_rate + self.failure_rate:
+            status, body = 500, 'Internal Server Error'
+        elif endpoint is None or params is None:
+            status, body = 400, {'Message': f'Unknown request {path}'}
+        else:
+            body = self.fixtures.get(fixture_key(endpoint, params))
+            if body is None:
+                body = self.fixtures.get(fixture_key(endpoint, ANY_PARAMS))
+            if body is None:
+                status, body = 404, {'Message': f'No fixture for {endpoint} {params}'}
+            else:
+                status = 200
+                if endpoint != 'espn_injuries':
+                    body = complete_result_sets(endpoint, body)
+                elif if_none_match and if_none_match == self.etag_for(body):
+                    status, body = 304, None
+
+        with self._lock:
+            key = (endpoint or path, status)
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+        return status, body
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+
+                if parsed.path == '/_stats':
+                    status, body = 200, server.stats()
+                else:
+                    status, body = server.respond(parsed.path, query, self.headers.get('If-None-Match'))
+
+                if status == 304:
+                    self.send_response(304)
+                    self.send_header('ETag', self.headers.get('If-None-Match'))
+                    self.end_headers()
+                    return
+
+                is_text = isinstance(body, str)
+                payload = (body if is_text else json.dumps(body)).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain' if is_text else 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                if status == 200 and ESPN_INJURIES_PATH.match(parsed.path):
+                    self.send_header('ETag', server.etag_for(body))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass  # one line per request would swamp load tests
+
+        return Handler
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Local stats.nba.com / ESPN stand-in for load testing")
+    arg_parser.add_argument('--fixtures', help="fixtures JSON from benchmark.py (default: synthetic 15-game night)")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--latency', type=float, default=0.2, help="seconds per response")
+    arg_parser.add_argument('--jitter', type=float, default=0.1, help="+/- seconds added to the latency")
+    arg_parser.add_argument('--throttle-rate', type=float, default=0.0, help="fraction of requests answered 429")
+    arg_parser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of requests answered 500")
+    arg_parser.add_argument('--rate-limit', type=float, default=None,
+                            help="requests/second above which every request gets 429")
+    return arg_parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else make_synthetic_fixtures()
+
+    server = StandInServer(fixtures, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                           throttle_rate=args.throttle_rate, failure_rate=args.failure_rate,
+                           rate_limit=args.rate_limit)
+    print(f"Serving {len(fixtures)} fixtures at {server.url} (stats at {server.url}/_stats)")
+    print(f"Run: python main.py --api-base-url {server.url} --no-cache")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(json.dumps(server.stats(), indent=2))
@@ -0,0 +1,40 @@
+import heapq
+import itertools
+
+
+class TopK:
+    """
+    The k largest items seen so far by key, kept in a bounded min-heap
+    push() is O(log k) and memory stays O(k) however many items stream past;
+    among equal keys the earliest pushed items are kept
+    """
+
+    def __init__(self, k, key=lambda item: item):
+        self.k = k
+        self.key = key
+        self._heap = []
+        self._counter = itertools.count()
+        self.seen = 0
+
+    def push(self, item):
+        """Offer an item; returns True if it is currently in the top k"""
+        self.seen += 1
+        if self.k <= 0:
+            return False
+
+        # Later items compare smaller on ties, so they are evicted first
+        entry = (self.key(item), -next(self._counter), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def items(self):
+        """Current top items, best first"""
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def __len__(self):
+        return len(self._heap)